@@ -0,0 +1,126 @@
+# Pooled vs per-call backend HTTP client.
+#
+#   PYTHONPATH=. python scripts/backend_pool_bench.py --requests 5000 --concurrency 50
+#
+# Starts a local stand-in backend that answers every request with a small task JSON after
+# --delay ms, then sends the same GETs through a new httpx.AsyncClient per call (what
+# HttpBackendClient did before it took the shared client) and through one client built
+# with the same limits as the container's. Reports p50/p99 latency and requests per second.
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+
+from src.infra.configs import BotConfig
+
+_BODY = json.dumps({
+    "id": 1,
+    "title": "Task",
+    "description": "Benchmark task",
+    "deadline": "2030-01-01T00:00:00+00:00",
+    "creation_date": "2025-01-01T00:00:00+00:00",
+    "pass_date": None,
+    "parent_id": None,
+    "subtasks": []
+}).encode()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                break
+            await asyncio.sleep(delay)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(_BODY)}\r\n\r\n".encode()
+                + _BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _pooled_client(base_url: str) -> httpx.AsyncClient:
+    # Same settings as SharedProvider.get_backend_http_client with the default BotConfig
+    fields = BotConfig.model_fields
+    return httpx.AsyncClient(
+        base_url=base_url,
+        cookies=CookieJar(DefaultCookiePolicy(allowed_domains=[])),
+        limits=httpx.Limits(
+            max_connections=fields["backend_max_connections"].default,
+            max_keepalive_connections=fields["backend_max_keepalive_connections"].default,
+            keepalive_expiry=fields["backend_keepalive_expiry"].default
+        )
+    )
+
+
+async def _per_call(base_url: str) -> None:
+    # The old client was never closed, close it here so the benchmark does not run out of sockets
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        client.cookies.update({"token": "bench"})
+        (await client.get("/api/v1/tasks/1")).raise_for_status()
+
+
+async def _pooled(client: httpx.AsyncClient) -> None:
+    (await client.get("/api/v1/tasks/1", headers={"Cookie": "token=bench"})).raise_for_status()
+
+
+async def _measure(call, requests: int, concurrency: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(requests: int, concurrency: int, delay: float) -> int:
+    server = await asyncio.start_server(lambda r, w: _serve(r, w, delay), "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    print(f"{'client':>10} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'req/s':>8}")
+    try:
+        async with _pooled_client(base_url) as client:
+            for name, call in (("per-call", lambda: _per_call(base_url)), ("pooled", lambda: _pooled(client))):
+                latencies, elapsed = await _measure(call, requests, concurrency)
+                print(
+                    f"{name:>10} {_percentile(latencies, 0.5) * 1000:>8.2f} "
+                    f"{_percentile(latencies, 0.99) * 1000:>8.2f} "
+                    f"{statistics.mean(latencies) * 1000:>8.2f} {requests / elapsed:>8.0f}"
+                )
+    finally:
+        server.close()
+        await server.wait_closed()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pooled vs per-call backend client benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=1.0, help="stand-in backend latency in ms")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.requests, args.concurrency, args.delay / 1000)))
+
+
+if __name__ == "__main__":
+    main()
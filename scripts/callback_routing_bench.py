@@ -0,0 +1,102 @@
+# Callback query dispatch cost: every handler's filters in turn vs the callback index.
+#
+#   REDIS_HOST=localhost REDIS_PASSWORD=... PYTHONPATH=. python scripts/callback_routing_bench.py --repeat 200
+#
+# Includes the bot's routers the way main does and builds one callback per indexed
+# handler: its exact value, or its prefix followed by "1", plus one no handler knows.
+# Each callback walks the routers in order until a handler's filters pass, once trying
+# every handler like TelegramEventObserver.trigger and once only the candidates of
+# CallbackIndex. Handlers are not called, so the numbers are the routing cost alone.
+# Reports microseconds per callback, filter checks per callback and the slowest one.
+# The Redis settings only have to be present, importing src.main does not connect.
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Callable, Optional
+
+from aiogram import Dispatcher
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import CallbackQuery, User
+
+from src.interfaces.handlers.telegram.routing import CallbackQueryObserver, _callback_key
+from src.main import include_routers
+
+_MISS = "bench_no_such_callback"
+
+
+def _callback(data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=1, is_bot=False, first_name="Bench"),
+        chat_instance="1",
+        data=data
+    )
+
+
+def _lookup(observer, indexed: bool) -> Callable[[Optional[str]], list[HandlerObject]]:
+    if indexed and isinstance(observer, CallbackQueryObserver):
+        return observer.index.candidates
+    return lambda _: observer.handlers
+
+
+async def _dispatch(lookups: list, event: CallbackQuery) -> int:
+    checks = 0
+    for lookup in lookups:
+        for handler in lookup(event.data):
+            checks += 1
+            result, _ = await handler.check(event, handler=handler, raw_state=None)
+            if result:
+                return checks
+    return checks
+
+
+def _samples(observers: list) -> list[str]:
+    samples = []
+    for observer in observers:
+        for handler in observer.handlers:
+            key = next(filter(None, map(_callback_key, handler.filters or [])), None)
+            if key is not None:
+                samples.append(key[1] if key[0] == "exact" else key[1] + "1")
+    return samples + [_MISS]
+
+
+async def _measure(lookups: list, events: list[CallbackQuery], repeat: int):
+    timings, checks = [], []
+    for event in events:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            done = await _dispatch(lookups, event)
+        timings.append((time.perf_counter() - started) / repeat)
+        checks.append(done)
+    return timings, checks
+
+
+async def run(repeat: int) -> int:
+    dispatcher = Dispatcher()
+    include_routers(dispatcher)
+    observers = [router.callback_query for router in dispatcher.chain_tail]
+    events = [_callback(data) for data in _samples(observers)]
+    print(f"{len(events)} callbacks over {sum(len(observer.handlers) for observer in observers)} handlers")
+    print(f"{'routing':>8} {'mean us':>8} {'p50 us':>8} {'max us':>8} {'checks':>7}  slowest")
+    for name, indexed in (("linear", False), ("indexed", True)):
+        lookups = [_lookup(observer, indexed) for observer in observers]
+        timings, checks = await _measure(lookups, events, repeat)
+        slowest = max(range(len(events)), key=timings.__getitem__)
+        print(
+            f"{name:>8} {statistics.mean(timings) * 1e6:>8.1f} {statistics.median(timings) * 1e6:>8.1f} "
+            f"{timings[slowest] * 1e6:>8.1f} {statistics.mean(checks):>7.1f}  {events[slowest].data}"
+        )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Callback routing micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
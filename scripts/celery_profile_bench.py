@@ -0,0 +1,82 @@
+# Redis memory and operations of the dev and prod Celery profiles.
+#
+#   REDIS_HOST=localhost REDIS_PASSWORD=... PYTHONPATH=. python scripts/celery_profile_bench.py --db 15 --reminders 100000
+#
+# For each profile it queues --reminders notify tasks the way CeleryNotifyService does and,
+# where the profile keeps results, stores the result a worker writes after every run.
+# It then reports the Redis memory they take, the commands Redis processed and reminders
+# per second. Use an empty database: the script refuses to run on a non-empty one and
+# flushes it between profiles.
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from celery import Celery  # type: ignore
+from redis import Redis
+
+from src.celery_app import _prod_profile
+from src.infra.configs import CeleryConfig, RedisConfig
+
+_NOTIFY = "src.infra.tasks.notify.notify"
+
+
+def _app(profile: str, url: str) -> Celery:
+    # Same settings as get_celery, without the worker container
+    app = Celery("celery_profile_bench")
+    app.conf.broker_url = url
+    app.conf.result_backend = url
+    if profile == "prod":
+        _prod_profile(app, CeleryConfig(celery_profile="prod"))
+    return app
+
+
+def _stats(redis: Redis) -> tuple[int, int]:
+    return redis.info("memory")["used_memory"], redis.info("stats")["total_commands_processed"]
+
+
+def _run(app: Celery, reminders: int) -> float:
+    eta = datetime.now(timezone.utc) + timedelta(days=1)
+    started = time.perf_counter()
+    with app.producer_or_acquire() as producer:
+        for num in range(reminders):
+            id_ = str(uuid.uuid4())
+            app.send_task(_NOTIFY, args=[f"Reminder {num}", 1, "bench", 1], eta=eta, task_id=id_, producer=producer)
+            if not app.conf.task_ignore_result:
+                app.backend.store_result(id_, None, "SUCCESS")
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Celery profile Redis cost benchmark")
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--reminders", type=int, default=100_000)
+    args = parser.parse_args()
+    url = f"{RedisConfig().conn_url}/{args.db}"
+    redis = Redis.from_url(url)
+    if redis.dbsize():
+        print(f"Database {args.db} is not empty, use an empty one", file=sys.stderr)
+        sys.exit(1)
+    print(f"{'profile':>8} {'memory MB':>10} {'commands':>10} {'per reminder':>13} {'reminders/s':>12}")
+    try:
+        for profile in ("dev", "prod"):
+            app = _app(profile, url)
+            memory, commands = _stats(redis)
+            elapsed = _run(app, args.reminders)
+            memory_after, commands_after = _stats(redis)
+            # INFO itself counts as a command
+            done = commands_after - commands - 1
+            print(
+                f"{profile:>8} {(memory_after - memory) / 2 ** 20:>10.1f} {done:>10} "
+                f"{done / args.reminders:>13.2f} {args.reminders / elapsed:>12.0f}"
+            )
+            app.close()
+            redis.flushdb()
+    finally:
+        redis.flushdb()
+        redis.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Country name lookup: the precomputed CountryClient index vs pycountry's search_fuzzy.
+#
+#   PYTHONPATH=. python scripts/country_lookup_bench.py --rounds 200
+#
+# Times both on a mix of exact names, codes, aliases, typos and partial names as users
+# type them in the timezone dialog, and prints the per-query latency and what each returned.
+import argparse
+import statistics
+import time
+
+from pycountry import countries
+
+from src.infra.clients.country import CountryClient
+
+_QUERIES = [
+    "Germany", "germany", "DE", "USA", "UK", "Russia", "Brasil", "Untied States",
+    "Phillipines", "south korea", "Côte d'Ivoire", "ivory coast", "Bavaria", "Kazakstan", "zzz"
+]
+
+
+def _fuzzy(query: str):
+    try:
+        return countries.search_fuzzy(query)[0].alpha_2
+    except LookupError:
+        return None
+
+
+def _time(fn, query: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(query)
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Country lookup benchmark")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    client = CountryClient()
+    print(f"Index built in {(time.perf_counter() - started) * 1000:.1f}ms")
+    # search_fuzzy loads the database on first use, keep that out of the per-query numbers
+    _fuzzy("Germany")
+    print(f"{'query':>16} {'fuzzy ms':>10} {'index ms':>10} {'fuzzy':>7} {'index':>7}")
+    fuzzy_times, index_times = [], []
+    for query in _QUERIES:
+        fuzzy_time = _time(_fuzzy, query, max(1, args.rounds // 20))
+        index_time = _time(client.get_country_code_by_name, query, args.rounds)
+        fuzzy_times.append(fuzzy_time)
+        index_times.append(index_time)
+        print(
+            f"{query:>16} {fuzzy_time * 1000:>10.3f} {index_time * 1000:>10.4f} "
+            f"{str(_fuzzy(query)):>7} {str(client.get_country_code_by_name(query)):>7}"
+        )
+    print(
+        f"{'median':>16} {statistics.median(fuzzy_times) * 1000:>10.3f} "
+        f"{statistics.median(index_times) * 1000:>10.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Cost of decoding backend task responses into domain entities.
+#
+#   PYTHONPATH=. python scripts/decode_bench.py --rounds 20000 --page-size 50
+#
+# Compares the current single-pass decoders in src.application.dto.task with the path
+# HttpBackendClient used before: response.json(), a pydantic model, model_dump() and
+# Task(**data) for one task, and TaskPreview(**data) without validation for a page.
+import argparse
+import json
+import timeit
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.application.dto.task import decode_task, tasks_page_adapter
+from src.domain.entities import Task, TaskPreview
+
+
+class TaskViewSchema(BaseModel):
+    # The schema the old path validated with, kept here only to measure it
+    id: int
+    title: str
+    description: str
+    creation_date: datetime
+    deadline: datetime
+    pass_date: Optional[datetime] = None
+    parent_id: Optional[int] = None
+
+
+def _task(num: int) -> dict:
+    return {
+        "id": num,
+        "title": f"Task {num}",
+        "description": "Benchmark task " * 4,
+        "creation_date": "2025-01-01T00:00:00+00:00",
+        "deadline": "2030-01-01T12:30:00+00:00",
+        "pass_date": None,
+        "parent_id": None
+    }
+
+
+def _old_task(raw: bytes) -> Task:
+    return Task(**TaskViewSchema.model_validate(json.loads(raw)).model_dump())
+
+
+def _old_page(raw: bytes) -> tuple:
+    data = json.loads(raw)
+    return data["prev_page"], data["next_page"], [TaskPreview(**task) for task in data["tasks"]]
+
+
+def _report(name: str, old, new, rounds: int) -> None:
+    old_time = min(timeit.repeat(old, number=rounds, repeat=3)) / rounds
+    new_time = min(timeit.repeat(new, number=rounds, repeat=3)) / rounds
+    print(f"{name:>12} {old_time * 1e6:>10.2f} {new_time * 1e6:>10.2f} {old_time / new_time:>8.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backend response decoding benchmark")
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    task = json.dumps(_task(1)).encode()
+    page = json.dumps({
+        "prev_page": 1,
+        "next_page": 3,
+        "tasks": [{"id": num, "title": f"Task {num}"} for num in range(args.page_size)]
+    }).encode()
+    assert _old_task(task) == decode_task(task)
+    print(f"{'response':>12} {'old us':>10} {'new us':>10} {'speedup':>9}")
+    _report("task", lambda: _old_task(task), lambda: decode_task(task), args.rounds)
+    # The new page path validates every preview, the old one did not validate at all
+    _report(
+        f"page of {args.page_size}",
+        lambda: _old_page(page),
+        lambda: tasks_page_adapter.validate_json(page),
+        max(1, args.rounds // 10)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Startup time and per-update latency of the launch modes of src/main.py.
+#
+#   REDIS_HOST=localhost REDIS_PASSWORD=... PYTHONPATH=. python scripts/launch_bench.py --updates 500 --interval 10
+#
+# Each mode starts a fresh bot process that imports src.main and polls a local fake
+# Telegram server with a dispatcher answering every message. "direct" runs it through
+# run(), on uvloop when installed, "asyncio" on the default event loop and "reload" under
+# watchfiles.run_process the way AUTO_RELOAD does. The fake server hands out one update
+# every --interval ms and measures the time until the answer arrives. Reports the time
+# from spawning the process to its first getUpdates, the answer latency after --warmup
+# updates and the CPU time of the whole process tree. The Redis settings only have to be
+# present, the container is not started and nothing connects to Redis.
+import argparse
+import asyncio
+import resource
+import signal
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+_TOKEN = "42:bench"
+_MODES = ("direct", "asyncio", "reload")
+
+
+def _poll(api: str):
+    from aiogram import Bot, Dispatcher, F
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+    from aiogram.types import Message
+
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text)
+    async def answer(message: Message):
+        await message.answer("pong")
+
+    bot = Bot(_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(api)))
+    return dispatcher.start_polling(bot, polling_timeout=1)
+
+
+def _start(mode: str, api: str) -> None:
+    # The import is part of the startup being measured
+    from src import main as bot_main
+    if mode == "asyncio":
+        asyncio.run(_poll(api))
+    else:
+        bot_main.run(_poll(api))
+
+
+def _child(mode: str, api: str) -> None:
+    if mode == "reload":
+        import watchfiles
+        watchfiles.run_process(".", target=_start, args=("reload", api))
+    else:
+        _start(mode, api)
+
+
+class _FakeTelegram:
+    def __init__(self, updates: int, interval: float):
+        self._updates = updates
+        self._interval = interval
+        self._next = 1
+        self._served: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.polled = asyncio.Event()
+        self.done = asyncio.Event()
+
+    def reset(self) -> None:
+        self._next = 1
+        self._served.clear()
+        self.latencies.clear()
+        self.polled.clear()
+        self.done.clear()
+
+    def _update(self, num: int) -> dict:
+        user = {"id": num, "is_bot": False, "first_name": "Bench"}
+        return {
+            "update_id": num,
+            "message": {
+                "message_id": num,
+                "date": int(time.time()),
+                "chat": {"id": num, "type": "private"},
+                "from": user,
+                "text": "ping"
+            }
+        }
+
+    async def get_me(self, _: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "result": {"id": 42, "is_bot": True, "first_name": "Bench"}})
+
+    async def get_updates(self, _: web.Request) -> web.Response:
+        self.polled.set()
+        if self._next > self._updates:
+            await asyncio.sleep(0.1)
+            return web.json_response({"ok": True, "result": []})
+        await asyncio.sleep(self._interval)
+        num = self._next
+        self._next += 1
+        self._served[num] = time.perf_counter()
+        return web.json_response({"ok": True, "result": [self._update(num)]})
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        params = await request.post()
+        chat_id = int(params["chat_id"])
+        self.latencies.append(time.perf_counter() - self._served[chat_id])
+        if len(self.latencies) == self._updates:
+            self.done.set()
+        return web.json_response({"ok": True, "result": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params["text"]
+        }})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(f"/bot{_TOKEN}/getMe", self.get_me)
+        app.router.add_post(f"/bot{_TOKEN}/getUpdates", self.get_updates)
+        app.router.add_post(f"/bot{_TOKEN}/sendMessage", self.send_message)
+        return app
+
+
+async def _measure(fake: _FakeTelegram, mode: str, api: str) -> tuple[float, list[float], float]:
+    fake.reset()
+    cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(sys.executable, __file__, "--child", mode, "--api", api)
+    try:
+        await fake.polled.wait()
+        startup = time.perf_counter() - started
+        await fake.done.wait()
+    finally:
+        process.send_signal(signal.SIGINT)
+        await process.wait()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    spent = after.ru_utime - cpu.ru_utime + after.ru_stime - cpu.ru_stime
+    return startup, list(fake.latencies), spent
+
+
+async def run(modes: list[str], updates: int, interval: float, warmup: int) -> int:
+    fake = _FakeTelegram(updates + warmup, interval)
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    api = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    print(f"{'mode':>8} {'startup s':>10} {'p50 ms':>8} {'p99 ms':>8} {'cpu s':>7}")
+    try:
+        for mode in modes:
+            startup, latencies, cpu = await _measure(fake, mode, api)
+            latencies = sorted(latencies[warmup:])
+            print(
+                f"{mode:>8} {startup:>10.2f} {statistics.median(latencies) * 1000:>8.2f} "
+                f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:>8.2f} {cpu:>7.2f}"
+            )
+    finally:
+        await runner.cleanup()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Launch mode startup and latency benchmark")
+    parser.add_argument("--modes", default=",".join(_MODES))
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=10.0, help="time between updates in ms")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--child", choices=_MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--api", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.api)
+        return
+    sys.exit(asyncio.run(run(args.modes.split(","), args.updates, args.interval / 1000, args.warmup)))
+
+
+if __name__ == "__main__":
+    main()
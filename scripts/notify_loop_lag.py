@@ -0,0 +1,86 @@
+# Event loop lag caused by scheduling and revoking Celery reminders from handlers.
+#
+#   REDIS_HOST=localhost REDIS_PASSWORD=... PYTHONPATH=. python scripts/notify_loop_lag.py --users 50 --reminders 5
+#
+# Each simulated user sets --reminders reminders and then cancels them all, the way
+# SetReminder and ChangeDeadline do. The old path calls notify.apply_async and one
+# control.revoke per reminder on the event loop, the new one goes through
+# CeleryNotifyService in revoke mode. A probe task sleeps 1ms in a loop and records by
+# how much each wake-up was late. Point it at a throwaway Redis: the reminders stay in
+# the broker queues until a worker drops them as revoked.
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.celery_app import celery_app
+from src.infra.services.notify import CeleryNotifyService
+from src.infra.tasks.notify import notify
+
+_PROBE_INTERVAL = 0.001
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(_PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - _PROBE_INTERVAL)
+
+
+async def _old_user(reminders: int, eta: datetime) -> None:
+    ids = []
+    for num in range(reminders):
+        id_ = str(uuid.uuid4())
+        notify.apply_async(args=[f"Reminder {num}", 1, "lag_bench", 1], eta=eta, task_id=id_)
+        ids.append(id_)
+    for id_ in ids:
+        celery_app.control.revoke(id_, terminate=True)
+
+
+async def _new_user(service: CeleryNotifyService, reminders: int, eta: datetime) -> None:
+    ids = [await service.send_notify("lag_bench", 1, f"Reminder {num}", 1, eta) for num in range(reminders)]
+    await service.revoke_many(ids)
+
+
+async def _measure(user, users: int) -> tuple[list[float], float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return lags, elapsed
+
+
+async def run(users: int, reminders: int) -> int:
+    eta = datetime.now(timezone.utc) + timedelta(days=1)
+    service = CeleryNotifyService("revoke")
+    print(f"{'path':>6} {'seconds':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for name, user in (
+        ("old", lambda: _old_user(reminders, eta)),
+        ("new", lambda: _new_user(service, reminders, eta))
+    ):
+        lags, elapsed = await _measure(user, users)
+        lags.sort()
+        print(
+            f"{name:>6} {elapsed:>8.2f} {statistics.median(lags) * 1000:>11.2f} "
+            f"{lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000:>11.2f} {lags[-1] * 1000:>11.2f}"
+        )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event loop lag of reminder scheduling")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--reminders", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.users, args.reminders)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Reminder cleanup of whole task trees: one call per task vs the bulk script.
+#
+#   PYTHONPATH=. python scripts/reminder_cleanup_bench.py --url redis://localhost:6379/15 --sizes 10,200,2000
+#
+# For every tree size it writes a reminder tab with --reminders entries for each task, then
+# clears the tree with delete_all_reminders per task (how ForceFinishTask and delete_task_yes
+# cleaned up before) and with delete_all_reminders_many, and reports the time of each.
+# Tabs are written under the user name "cleanup_bench", which must not exist in the database.
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio import Redis
+
+from src.infra.redis_storage import AsyncRedisBotStorage
+
+_USER = "cleanup_bench"
+
+
+async def _fill(redis: Redis, task_ids: list[int], reminders: int) -> None:
+    eta = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_id in task_ids:
+            pipe.hset(f"rms:{_USER}:{task_id}", mapping={uuid.uuid4().hex: eta for _ in range(reminders)})
+        await pipe.execute()
+
+
+async def _per_task(storage: AsyncRedisBotStorage, task_ids: list[int]) -> int:
+    removed = 0
+    for task_id in task_ids:
+        removed += len(await storage.delete_all_reminders(_USER, task_id))
+    return removed
+
+
+async def _bulk(storage: AsyncRedisBotStorage, task_ids: list[int]) -> int:
+    return len(await storage.delete_all_reminders_many(_USER, task_ids))
+
+
+async def _measure(redis: Redis, clear, task_ids: list[int], reminders: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        await _fill(redis, task_ids, reminders)
+        started = time.perf_counter()
+        removed = await clear(task_ids)
+        timings.append(time.perf_counter() - started)
+        assert removed == len(task_ids) * reminders, removed
+    return statistics.median(timings)
+
+
+async def run(url: str, sizes: list[int], reminders: int, repeat: int) -> int:
+    redis = Redis.from_url(url, decode_responses=True)
+    try:
+        if [key async for key in redis.scan_iter(match=f"rms:{_USER}:*", count=1000)]:
+            print(f"Reminder tabs of '{_USER}' already exist in this database, use an empty one", file=sys.stderr)
+            return 1
+        storage = AsyncRedisBotStorage(redis)
+        print(f"{'tasks':>8} {'per task ms':>12} {'bulk ms':>10} {'speedup':>9}")
+        for size in sizes:
+            task_ids = list(range(1, size + 1))
+            per_task = await _measure(redis, lambda ids: _per_task(storage, ids), task_ids, reminders, repeat)
+            bulk = await _measure(redis, lambda ids: _bulk(storage, ids), task_ids, reminders, repeat)
+            print(f"{size:>8} {per_task * 1000:>12.2f} {bulk * 1000:>10.2f} {per_task / bulk:>8.1f}x")
+        return 0
+    finally:
+        keys = [key async for key in redis.scan_iter(match=f"rms:{_USER}:*", count=1000)]
+        if keys:
+            await redis.delete(*keys)
+        await redis.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reminder tree cleanup benchmark")
+    parser.add_argument("--url", default="redis://localhost:6379/15")
+    parser.add_argument("--sizes", default="10,200,2000")
+    parser.add_argument("--reminders", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    sys.exit(asyncio.run(run(args.url, sizes, args.reminders, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
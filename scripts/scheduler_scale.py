@@ -0,0 +1,124 @@
+# Scale check for the Redis reminder scheduler (NOTIFY_BACKEND=redis).
+#
+#   PYTHONPATH=. python scripts/scheduler_scale.py --url redis://localhost:6379/15 --sizes 10000,100000,1000000
+#
+# For every size it loads that many future reminders, makes --due of them due and drains
+# them with claim/ack, then reports claim latency per batch. Claim cost should grow with
+# the batch size and only logarithmically with the number of scheduled reminders.
+# Use an empty database: the script refuses to run if reminders are already scheduled
+# and deletes the scheduler keys when it is done.
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio import Redis
+
+from src.infra.scheduler import ReminderScheduler, Reminder, _DUE_KEY, _LEASED_KEY, _PAYLOADS_KEY
+
+_LOAD_CHUNK = 10_000
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _load(redis: Redis, count: int, now: float) -> None:
+    # Bulk load in the same layout ReminderScheduler.schedule writes, one reminder at a time is too slow for 1M
+    payload = json.dumps({"text": "Reminder", "chat_id": 1, "tg_name": "scale", "task_id": 1})
+    for start in range(0, count, _LOAD_CHUNK):
+        ids = [uuid.uuid4().hex for _ in range(min(_LOAD_CHUNK, count - start))]
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(_PAYLOADS_KEY, mapping={id_: payload for id_ in ids})
+            # Spread over the next 30 days so none of them is due
+            pipe.zadd(_DUE_KEY, {id_: now + 3600 + (start + num) % (30 * 86400) for num, id_ in enumerate(ids)})
+            await pipe.execute()
+
+
+async def _make_due(redis: Redis, count: int, now: float) -> None:
+    ids = await redis.zrange(_DUE_KEY, 0, count - 1)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zadd(_DUE_KEY, {id_: now - 1 for id_ in ids})
+        await pipe.execute()
+
+
+async def _clear(redis: Redis) -> None:
+    await redis.delete(_DUE_KEY, _LEASED_KEY, _PAYLOADS_KEY)
+
+
+async def _schedule_latency(scheduler: ReminderScheduler, samples: int) -> list[float]:
+    eta = datetime.now(timezone.utc) + timedelta(days=60)
+    latencies = []
+    for _ in range(samples):
+        reminder = Reminder(uuid.uuid4().hex, "Reminder", 1, "scale", 1)
+        started = time.perf_counter()
+        await scheduler.schedule(reminder, eta)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def _drain(scheduler: ReminderScheduler, now: float) -> tuple[list[float], int, float]:
+    latencies = []
+    claimed = 0
+    started = time.perf_counter()
+    while True:
+        claim_started = time.perf_counter()
+        reminders = await scheduler.claim(now)
+        if not reminders:
+            break
+        latencies.append(time.perf_counter() - claim_started)
+        await scheduler.ack([reminder.id for reminder in reminders])
+        claimed += len(reminders)
+    return latencies, claimed, time.perf_counter() - started
+
+
+async def run(url: str, sizes: list[int], due: int, batch_size: int) -> int:
+    redis = Redis.from_url(url, decode_responses=True)
+    try:
+        if await redis.exists(_DUE_KEY, _LEASED_KEY, _PAYLOADS_KEY):
+            print("Reminder keys already exist in this database, use an empty one", file=sys.stderr)
+            return 1
+        scheduler = ReminderScheduler(redis, batch_size=batch_size)
+        print(
+            f"{'scheduled':>10} {'load s':>8} {'schedule p50/p99 ms':>20} "
+            f"{'claim p50/p99 ms':>18} {'drained/s':>10}"
+        )
+        for size in sizes:
+            now = time.time()
+            load_started = time.perf_counter()
+            await _load(redis, size, now)
+            load_time = time.perf_counter() - load_started
+            schedule = await _schedule_latency(scheduler, 1000)
+            await _make_due(redis, min(due, size), now)
+            claims, claimed, drain_time = await _drain(scheduler, now)
+            print(
+                f"{size:>10} {load_time:>8.1f} "
+                f"{_percentile(schedule, 0.5) * 1000:>9.3f}/{_percentile(schedule, 0.99) * 1000:<10.3f} "
+                f"{statistics.median(claims) * 1000:>8.3f}/{_percentile(claims, 0.99) * 1000:<9.3f} "
+                f"{claimed / drain_time:>10.0f}"
+            )
+            await _clear(redis)
+        return 0
+    finally:
+        await _clear(redis)
+        await redis.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reminder scheduler scale check")
+    parser.add_argument("--url", default="redis://localhost:6379/15")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--due", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    sys.exit(asyncio.run(run(args.url, sizes, args.due, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
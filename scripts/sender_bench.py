@@ -0,0 +1,127 @@
+# Reminder send throughput against a local fake Bot API server.
+#
+#   PYTHONPATH=. python scripts/sender_bench.py --messages 2000 --concurrency 20
+#
+# Sends --messages reminders to distinct chats twice: one blocking POST at a time on a
+# pooled httpx.Client, the way the notify Celery task sends them, and through
+# TelegramSender on an aiogram Bot pointed at the fake server. The fake server answers
+# after --latency ms, standing in for the round trip to Telegram. Every --flood-every-th
+# request is answered with a 429 asking to retry after --retry-after seconds, so both
+# runs include flood control. The rate limiter is left out: it needs Redis and caps both
+# paths equally. Run it pinned to one core (taskset -c 0) to read the result per core.
+import argparse
+import asyncio
+import itertools
+import sys
+import threading
+import time
+
+import httpx
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+from src.infra.scheduler import Reminder
+from src.infra.sender import TelegramSender, coalesce
+
+_TOKEN = "42:bench"
+
+
+def _fake_api(latency: float, flood_every: int, retry_after: int) -> web.Application:
+    counter = itertools.count(1)
+
+    async def send_message(request: web.Request) -> web.Response:
+        payload = await request.post() if request.content_type != "application/json" else await request.json()
+        await asyncio.sleep(latency)
+        if flood_every and next(counter) % flood_every == 0:
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests",
+                    "parameters": {"retry_after": retry_after}
+                },
+                status=429
+            )
+        chat_id = int(payload["chat_id"])
+        return web.json_response({"ok": True, "result": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": payload["text"]
+        }})
+
+    app = web.Application()
+    app.router.add_post(f"/bot{_TOKEN}/sendMessage", send_message)
+    return app
+
+
+def _blocking(base_url: str, reminders: list[Reminder]) -> float:
+    started = time.perf_counter()
+    with httpx.Client(timeout=10.0) as client:
+        for reminder in reminders:
+            while True:
+                response = client.post(f"{base_url}/bot{_TOKEN}/sendMessage", json={
+                    "chat_id": reminder.chat_id,
+                    "text": f"<b>{reminder.text}</b>",
+                    "parse_mode": "HTML"
+                })
+                if response.status_code != 429:
+                    response.raise_for_status()
+                    break
+                # The task retries through Celery, a sleep stands in for the countdown
+                time.sleep(response.json()["parameters"]["retry_after"])
+    return time.perf_counter() - started
+
+
+async def _async(base_url: str, reminders: list[Reminder], concurrency: int) -> tuple[float, int]:
+    bot = Bot(_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(base_url)))
+    sender = TelegramSender(bot, concurrency)
+    sender.start()
+    try:
+        started = time.perf_counter()
+        results = await sender.send_many(coalesce(reminders, max_group=1))
+        return time.perf_counter() - started, results.count(False)
+    finally:
+        await sender.close()
+        await bot.session.close()
+
+
+async def run(messages: int, concurrency: int, latency: float, flood_every: int, retry_after: int) -> int:
+    runner = web.AppRunner(_fake_api(latency, flood_every, retry_after), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    reminders = [Reminder(str(num), f"Reminder {num}", num, f"user{num}", num) for num in range(1, messages + 1)]
+    try:
+        # The blocking client runs in a thread so the fake server keeps serving on this loop
+        result: list[float] = []
+        thread = threading.Thread(target=lambda: result.append(_blocking(base_url, reminders)))
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.05)
+        blocking = result[0]
+        elapsed, failed = await _async(base_url, reminders, concurrency)
+    finally:
+        await runner.cleanup()
+    print(f"{'sender':>12} {'seconds':>9} {'msg/s':>9}")
+    print(f"{'blocking':>12} {blocking:>9.2f} {messages / blocking:>9.0f}")
+    print(f"{'async':>12} {elapsed:>9.2f} {messages / elapsed:>9.0f}")
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reminder sender throughput benchmark")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=30.0, help="fake Bot API answer delay in ms")
+    parser.add_argument("--flood-every", type=int, default=0, help="answer every n-th request with a 429, 0 never")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.messages, args.concurrency, args.latency / 1000, args.flood_every, args.retry_after)))
+
+
+if __name__ == "__main__":
+    main()
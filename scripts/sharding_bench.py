@@ -0,0 +1,110 @@
+# Update throughput of the supervisor mode with 1 to N worker processes.
+#
+#   PYTHONPATH=. python scripts/sharding_bench.py --workers 1,2,4 --updates 2000 --work 2
+#
+# For every worker count it starts a WorkerPool whose workers run a dispatcher with one
+# handler that burns --work ms of CPU, standing in for rendering, validation and country
+# lookups. The supervisor feeds synthetic messages from distinct users through a
+# dispatcher with ForwardMiddleware, the way supervise() forwards polled updates, and
+# the script reports the time until every worker handled its share. The speedup is only
+# meaningful up to the number of cores the script may use, which it prints first.
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+from multiprocessing.queues import Queue
+
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Message
+
+from src.interfaces.sharding import ForwardMiddleware, WorkerPool, consume
+
+_TOKEN = "42:bench"
+
+
+def _update(num: int) -> dict:
+    user = {"id": num, "is_bot": False, "first_name": "Bench"}
+    return {
+        "update_id": num,
+        "message": {
+            "message_id": num,
+            "date": int(time.time()),
+            "chat": {"id": num, "type": "private"},
+            "from": user,
+            "text": "ping"
+        }
+    }
+
+
+async def _serve(done: Queue, work: float, updates: Queue) -> None:
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text)
+    async def handle(message: Message):
+        deadline = time.process_time() + work
+        while time.process_time() < deadline:
+            pass
+        done.put(message.message_id)
+
+    bot = Bot(_TOKEN)
+    done.put(0)
+    await consume(dispatcher, bot, updates, 5.0)
+    await bot.session.close()
+
+
+def _worker(done: Queue, work: float, updates: Queue) -> None:
+    asyncio.run(_serve(done, work, updates))
+
+
+def _wait(done: Queue, count: int) -> None:
+    for _ in range(count):
+        done.get()
+
+
+async def _measure(workers: int, updates: int, work: float) -> float:
+    # WorkerPool spawns its workers, the queue they report on has to come from the same context
+    done = multiprocessing.get_context("spawn").Queue()
+    pool = WorkerPool(partial(_worker, done, work), workers, lambda: None)
+    pool.start()
+    dispatcher = Dispatcher(disable_fsm=True)
+    dispatcher.update.outer_middleware(ForwardMiddleware(pool.queues))
+    bot = Bot(_TOKEN)
+    try:
+        # Every worker reports once it consumes, spawning them is not part of the measurement
+        await asyncio.to_thread(_wait, done, workers)
+        started = time.perf_counter()
+        for num in range(1, updates + 1):
+            await dispatcher.feed_raw_update(bot, _update(num))
+        await asyncio.to_thread(_wait, done, updates)
+        return time.perf_counter() - started
+    finally:
+        await pool.stop(10.0)
+        await bot.session.close()
+
+
+async def run(counts: list[int], updates: int, work: float) -> int:
+    print(f"Cores available: {len(os.sched_getaffinity(0))}")
+    print(f"{'workers':>8} {'seconds':>8} {'updates/s':>10} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        elapsed = await _measure(workers, updates, work)
+        base = base or elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {updates / elapsed:>10.0f} {base / elapsed:>7.2f}x")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Supervisor mode scaling benchmark")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--work", type=float, default=2.0, help="handler CPU time per update in ms")
+    args = parser.parse_args()
+    counts = [int(count) for count in args.workers.split(",")]
+    sys.exit(asyncio.run(run(counts, args.updates, args.work / 1000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Update throughput of polling vs webhook mode against a local fake Telegram server.
+#
+#   PYTHONPATH=. python scripts/webhook_bench.py --updates 2000 --work 20 --concurrency 50
+#
+# Every update is a message whose handler waits --work ms and answers through the fake
+# server. Polling drains the updates with getUpdates from the fake server. Webhook mode
+# runs run_webhook and --concurrency clients post the updates with the secret token.
+# Reports the time until every update was handled, updates per second, and for the
+# webhook the latency of the 200 acks Telegram would see. Both run in one process, the
+# webhook's gain is that more replicas can be added behind a load balancer.
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiogram import Bot, Dispatcher, F
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiohttp import web
+
+from src.infra.configs import BotConfig
+from src.interfaces.webhook import run_webhook
+from src.interfaces.webhook.server import webhook_secret
+
+_TOKEN = "42:bench"
+
+
+def _update(num: int) -> dict:
+    user = {"id": num % 1000 + 1, "is_bot": False, "first_name": "Bench"}
+    return {
+        "update_id": num,
+        "message": {
+            "message_id": num,
+            "date": int(time.time()),
+            "chat": {"id": user["id"], "type": "private"},
+            "from": user,
+            "text": "ping"
+        }
+    }
+
+
+def _fake_telegram(updates: list[dict]) -> web.Application:
+    async def get_updates(request: web.Request) -> web.Response:
+        params = await request.post()
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        # Update ids start at 1, so the update with id `offset` sits at index offset - 1
+        batch = updates[max(0, offset - 1):max(0, offset - 1) + limit]
+        if not batch:
+            await asyncio.sleep(0.1)
+        return web.json_response({"ok": True, "result": batch})
+
+    async def send_message(request: web.Request) -> web.Response:
+        params = await request.post()
+        return web.json_response({"ok": True, "result": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"},
+            "text": params["text"]
+        }})
+
+    async def get_me(_: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "result": {"id": 42, "is_bot": True, "first_name": "Bench"}})
+
+    app = web.Application()
+    app.router.add_post(f"/bot{_TOKEN}/getMe", get_me)
+    app.router.add_post(f"/bot{_TOKEN}/getUpdates", get_updates)
+    app.router.add_post(f"/bot{_TOKEN}/sendMessage", send_message)
+    return app
+
+
+def _dispatcher(expected: int, done: asyncio.Event, work: float) -> Dispatcher:
+    dispatcher = Dispatcher()
+    handled = 0
+
+    @dispatcher.message(F.text)
+    async def answer(message: Message):
+        nonlocal handled
+        await asyncio.sleep(work)
+        await message.answer("pong")
+        handled += 1
+        if handled == expected:
+            done.set()
+
+    return dispatcher
+
+
+async def _polling(bot: Bot, updates: int, work: float) -> float:
+    done = asyncio.Event()
+    dispatcher = _dispatcher(updates, done, work)
+    started = time.perf_counter()
+    polling = asyncio.create_task(
+        dispatcher.start_polling(bot, handle_signals=False, close_bot_session=False, polling_timeout=1)
+    )
+    await done.wait()
+    elapsed = time.perf_counter() - started
+    await dispatcher.stop_polling()
+    await polling
+    return elapsed
+
+
+async def _webhook(
+    bot: Bot,
+    updates: list[dict],
+    work: float,
+    concurrency: int,
+    port: int
+) -> tuple[float, list[float]]:
+    done = asyncio.Event()
+    dispatcher = _dispatcher(len(updates), done, work)
+    conf = BotConfig(
+        bot_token=_TOKEN,
+        base_api_url="http://unused",
+        secret="bench",
+        bot_send_message_base_url="http://unused",
+        bot_mode="webhook",
+        webhook_host="127.0.0.1",
+        webhook_port=port
+    )
+    stop = asyncio.Event()
+    server = asyncio.create_task(run_webhook(dispatcher, bot, conf, stop, lambda: asyncio.sleep(0)))
+    await asyncio.sleep(0.5)
+    url = f"http://127.0.0.1:{port}{conf.webhook_path}"
+    headers = {"X-Telegram-Bot-Api-Secret-Token": webhook_secret(conf)}
+    acks: list[float] = []
+    pending = iter(updates)
+
+    async def client(session: aiohttp.ClientSession):
+        for update in pending:
+            sent = time.perf_counter()
+            async with session.post(url, json=update, headers=headers) as response:
+                response.raise_for_status()
+            acks.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        await done.wait()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await server
+    return elapsed, acks
+
+
+async def run(count: int, work: float, concurrency: int, port: int) -> int:
+    updates = [_update(num) for num in range(1, count + 1)]
+    runner = web.AppRunner(_fake_telegram(updates), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    api = TelegramAPIServer.from_base(f"http://127.0.0.1:{runner.addresses[0][1]}")
+    bot = Bot(_TOKEN, session=AiohttpSession(api=api))
+    try:
+        polling = await _polling(bot, count, work)
+        webhook, acks = await _webhook(bot, updates, work, concurrency, port)
+    finally:
+        await bot.session.close()
+        await runner.cleanup()
+    acks.sort()
+    print(f"{'mode':>8} {'seconds':>8} {'updates/s':>10} {'ack p50 ms':>11} {'ack p99 ms':>11}")
+    print(f"{'polling':>8} {polling:>8.2f} {count / polling:>10.0f}")
+    print(
+        f"{'webhook':>8} {webhook:>8.2f} {count / webhook:>10.0f} {statistics.median(acks) * 1000:>11.2f} "
+        f"{acks[min(len(acks) - 1, int(len(acks) * 0.99))] * 1000:>11.2f}"
+    )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Polling vs webhook throughput benchmark")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--work", type=float, default=20.0, help="handler time per update in ms")
+    parser.add_argument("--concurrency", type=int, default=50, help="parallel webhook senders")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.updates, args.work / 1000, args.concurrency, args.port)))
+
+
+if __name__ == "__main__":
+    main()
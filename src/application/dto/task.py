@@ -1,19 +1,49 @@
-from typing import Optional
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Annotated, Optional
 
-from pydantic import BaseModel
+from pydantic import GetPydanticSchema, TypeAdapter
+from pydantic_core import core_schema
 
+from src.domain.entities import Task, TaskPreview
 
-class TaskViewSchema(BaseModel):
-    id: int
-    title: str
-    description: str
-    creation_date: datetime
-    deadline: datetime
-    pass_date: Optional[datetime] = None
-    parent_id: Optional[int] = None
 
+@dataclass(slots=True)
+class TasksPageDTO:
+    prev_page: Optional[int]
+    next_page: Optional[int]
+    tasks: list[TaskPreview]
 
-class TaskPreviewDTO(BaseModel):
-    id: int
-    title: str
+
+def _optional(schema: core_schema.CoreSchema) -> core_schema.CoreSchema:
+    return core_schema.with_default_schema(core_schema.nullable_schema(schema), default=None)
+
+
+# The full task view of the backend, in Task's field order. Unlike Task itself it requires
+# id, description and creation_date, and it builds the Task in the same validation pass.
+_TASK_VIEW_FIELDS = {
+    "title": core_schema.str_schema(),
+    "deadline": core_schema.datetime_schema(),
+    "id": core_schema.int_schema(),
+    "description": core_schema.str_schema(),
+    "parent_id": _optional(core_schema.int_schema()),
+    "creation_date": core_schema.datetime_schema(),
+    "pass_date": _optional(core_schema.datetime_schema())
+}
+_task_view_schema = core_schema.dataclass_schema(
+    Task,
+    core_schema.dataclass_args_schema(
+        "Task",
+        [core_schema.dataclass_field(name, schema) for name, schema in _TASK_VIEW_FIELDS.items()]
+    ),
+    list(_TASK_VIEW_FIELDS),
+    slots=True
+)
+
+task_adapter = TypeAdapter(Task)
+task_view_adapter = TypeAdapter(Annotated[Task, GetPydanticSchema(lambda _, __: _task_view_schema)])
+tasks_page_adapter = TypeAdapter(TasksPageDTO)
+
+
+def decode_task(raw: bytes) -> Task:
+    # Backend responses must carry the full view, cached tasks are decoded with task_adapter
+    return task_view_adapter.validate_json(raw)
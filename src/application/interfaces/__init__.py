@@ -1 +1,2 @@
 from .storage import AsyncStorageInterface, SyncStorageInterface
+from .cache import TaskCacheInterface, TasksPage, ProfileCacheInterface
@@ -0,0 +1,33 @@
+from typing import Protocol, Optional, Iterable
+
+from src.domain.entities import Task, TaskPreview, UserProfile
+
+TasksPage = tuple[int, int, list[TaskPreview]]
+
+
+class TaskCacheInterface(Protocol):
+    hits: int
+    misses: int
+    hit_rate: float
+
+    async def generation(self, tg_name: str) -> int: ...
+    async def get_task(self, tg_name: str, task_id: int) -> Optional[Task]: ...
+    async def set_task(self, tg_name: str, task: Task, generation: Optional[int] = None) -> None: ...
+    async def get_page(self, tg_name: str, parent_id: Optional[int], key: str) -> Optional[TasksPage]: ...
+    async def has_page(self, tg_name: str, parent_id: Optional[int], key: str) -> bool: ...
+
+    async def set_page(
+        self,
+        tg_name: str,
+        parent_id: Optional[int],
+        key: str,
+        page: TasksPage,
+        generation: Optional[int] = None
+    ) -> None: ...
+    async def invalidate_tasks(self, tg_name: str, task_ids: Iterable[int]) -> None: ...
+    async def invalidate_pages(self, tg_name: str, parent_ids: Optional[Iterable[Optional[int]]] = None) -> None: ...
+
+
+class ProfileCacheInterface(Protocol):
+    async def get(self, tg_name: str) -> UserProfile: ...
+    def invalidate(self, tg_name: Optional[str] = None) -> None: ...
@@ -3,3 +3,4 @@ from typing import Protocol, Optional
 
 class CountryClientInterface(Protocol):
     def get_country_code_by_name(self, country_name: str) -> Optional[str]: ...
+    def suggest_countries(self, country_name: str, limit: int = 5) -> list[str]: ...
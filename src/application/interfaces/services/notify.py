@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, Optional
 from datetime import datetime
 
 
@@ -9,6 +9,8 @@ class NotifyServiceInterface(Protocol):
         task_id: int,
         message_text: str,
         chat_id: int,
-        scheduled_time: datetime
+        scheduled_time: datetime,
+        id_: Optional[str] = None
     ) -> str: ...
-    def revoke_reminder(self, id_: str) -> None: ...
+    async def revoke_reminder(self, id_: str) -> None: ...
+    async def revoke_many(self, ids: list[str]) -> None: ...
@@ -1,14 +1,22 @@
-from typing import Protocol, Optional, overload, Awaitable
+from typing import Protocol, Optional, overload, Awaitable, Callable
 from datetime import timezone, datetime
 
+from src.domain.entities import UserProfile
+
 
 class AsyncStorageInterface(Protocol):
     async def get_tz(self, tg_name: str) -> Optional[timezone]: ...
     async def set_tz(self, tg_name: str, offset: int) -> None: ...
+    async def get_profile(self, tg_name: str) -> UserProfile: ...
+    async def set_registered(self, tg_name: str) -> None: ...
+    async def set_chat_id(self, tg_name: str, chat_id: int) -> None: ...
+    def on_profile_change(self, callback: Callable[[str], None]) -> None: ...
     async def get_reminders_tab(self, tg_name: str, task_id: int) -> Optional[dict[str, datetime]]: ...
     async def get_reminder(self, tg_name: str, id_: str, task_id: int) -> Optional[datetime]: ...
     async def delete_reminders(self, tg_name: str, reminders_ids: list[str], task_id: int) -> None: ...
+    async def delete_reminders_many(self, tabs: dict[tuple[str, int], list[str]]) -> None: ...
     async def delete_all_reminders(self, tg_name: str, task_id: int) -> list[str]: ...
+    async def delete_all_reminders_many(self, tg_name: str, task_ids: list[int]) -> list[str]: ...
     async def set_reminder(self, tg_name: str, eta: datetime, id_: str, task_id: int) -> None: ...
 
 
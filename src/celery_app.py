@@ -1,11 +1,15 @@
+from typing import Iterable
+
+import httpx
 from celery import Celery  # type: ignore
 from celery.signals import worker_process_shutdown  # type: ignore
 from dishka import make_container, Provider, provide, Scope, Container
 from dishka.integrations.celery import DishkaTask, setup_dishka
 from redis import Redis, from_url
 
-from src.infra.configs import BotConfig, RedisConfig
+from src.infra.configs import BotConfig, RedisConfig, NotifyConfig, CeleryConfig
 from src.infra.redis_storage import SyncRedisBotStorage
+from src.infra.rate_limit import SyncRedisRateLimiter
 from src.application.interfaces.storage import SyncStorageInterface
 
 
@@ -20,10 +24,35 @@ class WorkerProvider(Provider):
     def redis_conf(self) -> RedisConfig:
         return RedisConfig()  # type: ignore
 
+    @provide
+    def notify_conf(self) -> NotifyConfig:
+        return NotifyConfig()
+
+    @provide
+    def celery_conf(self) -> CeleryConfig:
+        return CeleryConfig()
+
     @provide
     def redis(self, conf: RedisConfig) -> Redis:
         return from_url(conf.conn_url, decode_responses=True)
 
+    @provide
+    def http_client(self) -> Iterable[httpx.Client]:
+        client = httpx.Client(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=10))
+        yield client
+        client.close()
+
+    @provide
+    def rate_limiter(self, conf: BotConfig, redis: Redis) -> SyncRedisRateLimiter:
+        return SyncRedisRateLimiter(
+            redis,
+            conf.rate_limit_global,
+            conf.rate_limit_global_burst,
+            conf.rate_limit_chat,
+            conf.rate_limit_chat_burst,
+            conf.rate_limit_reserve
+        )
+
     @provide(scope=Scope.REQUEST)
     def storage(self, redis: Redis) -> SyncStorageInterface:
         return SyncRedisBotStorage(redis)
@@ -32,11 +61,35 @@ class WorkerProvider(Provider):
 container = make_container(WorkerProvider())
 
 
+def _prod_profile(celery: Celery, conf: CeleryConfig):
+    # Nothing reads task results. Reminders wait in the broker at most max_eta, longer ETAs go in hops,
+    # so the visibility timeout stays short and a crashed worker's reminders come back within hours
+    celery.conf.result_backend = None
+    celery.conf.task_ignore_result = True
+    celery.conf.task_default_queue = "maintenance"
+    celery.conf.task_routes = {
+        "src.infra.tasks.notify.hop_reminder": {"queue": "maintenance"},
+        "src.infra.tasks.notify.*": {"queue": "reminders", "priority": 0},
+    }
+    celery.conf.task_default_priority = 5
+    celery.conf.worker_prefetch_multiplier = 1
+    celery.conf.task_acks_late = True
+    celery.conf.task_reject_on_worker_lost = True
+    celery.conf.broker_transport_options = {
+        "visibility_timeout": conf.celery_visibility_timeout,
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+    }
+
+
 def get_celery():
     celery = Celery(__name__, task_cls=DishkaTask)
     conf = container.get(RedisConfig)
     celery.conf.broker_url = conf.conn_url
     celery.conf.result_backend = conf.conn_url
+    celery_conf = container.get(CeleryConfig)
+    if celery_conf.celery_profile == "prod":
+        _prod_profile(celery, celery_conf)
     celery.autodiscover_tasks(['src.infra.tasks.notify'])
     setup_dishka(container, celery)
     return celery
@@ -1,6 +1,10 @@
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncIterable
+
+import httpx
 from dishka import make_async_container, Provider, provide, Scope
 from dishka.integrations.aiogram import AiogramProvider
-from redis.asyncio import from_url, Redis
+from redis.asyncio import Redis, BlockingConnectionPool
 from aiogram.fsm.storage.redis import RedisStorage
 from aiogram import Bot, Dispatcher
 
@@ -8,35 +12,85 @@ from src.application.interfaces.clients import *
 from src.application.interfaces import *
 from src.application.interfaces.services import *
 from src.infra.clients import *
-from src.infra.configs import RedisConfig, BotConfig
+from src.infra.configs import RedisConfig, BotConfig, NotifyConfig, CeleryConfig
 from src.infra.services import *
 from src.infra.redis_storage import AsyncRedisBotStorage
-from src.interfaces.handlers.telegram.middleware import HandleErrorMiddleware
+from src.infra.task_cache import LRUTaskCache, RedisTaskCache
+from src.infra.singleflight import SingleFlight
+from src.infra.prefetch import Prefetcher
+from src.infra.profile_cache import ProfileCache
+from src.infra.scheduler import ReminderScheduler
+from src.infra.sender import TelegramSender
+from src.infra.rate_limit import AsyncRedisRateLimiter, RateLimitRequestMiddleware
+from src.infra.clients.resilience import BackendGuard, CircuitBreaker, RetryBudget
+from src.interfaces.handlers.telegram.middleware import (
+    HandleErrorMiddleware,
+    UserProfileMiddleware,
+    InFlightMiddleware,
+    UserQueueMiddleware
+)
 from src.interfaces.handlers.telegram.tasks.shared import *
+from src.logger import logger
 
 
 class ClientsProvider(Provider):
     scope = Scope.REQUEST
 
     @provide
-    def get_backend_client(self, conf: BotConfig, token_service: TokenServiceInterface) -> BackendClientInterface:
-        return HttpBackendClient(conf.base_api_url, token_service)
+    def get_backend_client(
+        self,
+        conf: BotConfig,
+        client: httpx.AsyncClient,
+        token_service: TokenServiceInterface,
+        cache: TaskCacheInterface,
+        flights: SingleFlight,
+        prefetcher: Prefetcher,
+        guard: BackendGuard
+    ) -> BackendClientInterface:
+        backend = CoalescingBackendClient(HttpBackendClient(client, token_service, guard), flights)
+        if conf.task_cache == "none":
+            return backend
+        return CachedBackendClient(backend, cache, prefetcher)
 
-    country_client = provide(CountryClient, provides=CountryClientInterface)
+    @provide(scope=Scope.APP)
+    def get_country_client(self) -> CountryClientInterface:
+        return CountryClient()
 
-    @provide
-    def get_tz_client(self, conf: BotConfig) -> TimezoneClientInterface:
-        return HttpTZClient(conf.timezone_db_api_key, conf.timezone_db_url)
+    @provide(scope=Scope.APP)
+    def get_tz_client(self, conf: BotConfig, redis: Redis) -> TimezoneClientInterface:
+        http_client = RedisTZCache(
+            HttpTZClient(conf.timezone_db_api_key, conf.timezone_db_url),
+            redis,
+            conf.timezone_cache_ttl
+        )
+        if conf.timezone_source == "http":
+            return http_client
+        if conf.timezone_db_api_key and conf.timezone_db_url:
+            return ZoneInfoTZClient(http_client)
+        return ZoneInfoTZClient()
 
 
 class ServiceProvider(Provider):
     scope = Scope.REQUEST
 
-    @provide
+    @provide(scope=Scope.APP)
     def get_token_service(self, conf: BotConfig) -> TokenServiceInterface:
-        return JWTService(conf.secret)
+        return JWTService(conf.secret, conf.token_lifetime, conf.token_refresh_margin, conf.token_cache_size)
 
-    notify_service = provide(CeleryNotifyService, provides=NotifyServiceInterface)
+    @provide(scope=Scope.APP)
+    def get_notify_service(
+        self,
+        conf: NotifyConfig,
+        celery_conf: CeleryConfig,
+        scheduler: ReminderScheduler
+    ) -> NotifyServiceInterface:
+        if conf.notify_backend == "redis":
+            if conf.coalesce_window and conf.scheduler_handoff == "celery":
+                logger.warning("SCHEDULER_HANDOFF=celery sends reminders one by one, COALESCE_WINDOW has no effect")
+            return RedisNotifyService(scheduler)
+        if conf.coalesce_window:
+            logger.warning("NOTIFY_BACKEND=celery sends reminders one by one, COALESCE_WINDOW has no effect")
+        return CeleryNotifyService(conf.notify_cancel, celery_conf.max_eta)
 
 
 class ConfProvider(Provider):
@@ -50,6 +104,14 @@ class ConfProvider(Provider):
     def redis_conf(self) -> RedisConfig:
         return RedisConfig()
 
+    @provide
+    def notify_conf(self) -> NotifyConfig:
+        return NotifyConfig()
+
+    @provide
+    def celery_conf(self) -> CeleryConfig:
+        return CeleryConfig()
+
 
 class SharedProvider(Provider):
     scope = Scope.APP
@@ -61,21 +123,143 @@ class SharedProvider(Provider):
 
     @provide
     def get_redis(self, conf: RedisConfig) -> Redis:
-        return from_url(conf.conn_url, decode_responses=True)
+        # Webhook mode handles updates concurrently, wait for a free connection instead of failing
+        pool = BlockingConnectionPool.from_url(
+            conf.conn_url,
+            decode_responses=True,
+            max_connections=conf.redis_max_connections,
+            timeout=conf.redis_pool_timeout
+        )
+        return Redis(connection_pool=pool)
+
+    @provide
+    async def get_backend_http_client(self, conf: BotConfig) -> AsyncIterable[httpx.AsyncClient]:
+        client = httpx.AsyncClient(
+            base_url=conf.base_api_url,
+            http2=conf.backend_http2,
+            # The client is shared by all users, a cookie set for one must never reach another
+            cookies=CookieJar(DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(
+                max_connections=conf.backend_max_connections,
+                max_keepalive_connections=conf.backend_max_keepalive_connections,
+                keepalive_expiry=conf.backend_keepalive_expiry
+            )
+        )
+        yield client
+        await client.aclose()
+
+    @provide
+    def get_task_cache(self, conf: BotConfig, redis: Redis) -> TaskCacheInterface:
+        if conf.task_cache == "redis":
+            return RedisTaskCache(redis, conf.task_cache_ttl)
+        if conf.bot_mode == "webhook" and conf.task_cache == "memory":
+            logger.warning(
+                "TASK_CACHE=memory keeps tasks per process, replicas may serve changes made through "
+                f"another replica up to {conf.task_cache_ttl}s late. Use TASK_CACHE=redis with several replicas"
+            )
+        return LRUTaskCache(conf.task_cache_ttl, conf.task_cache_size)
+
+    flights = provide(SingleFlight)
+
+    @provide
+    def get_backend_guard(self, conf: BotConfig) -> BackendGuard:
+        return BackendGuard(
+            CircuitBreaker(conf.backend_breaker_threshold, conf.backend_breaker_reset_timeout),
+            RetryBudget(conf.backend_retry_budget_ratio),
+            conf.backend_timeout,
+            conf.backend_timeouts,
+            conf.backend_retries,
+            conf.backend_retry_backoff
+        )
+
+    @provide
+    async def get_prefetcher(self, conf: BotConfig) -> AsyncIterable[Prefetcher]:
+        prefetcher = Prefetcher(conf.prefetch_pages, conf.prefetch_concurrency)
+        yield prefetcher
+        await prefetcher.close()
+
+    @provide
+    def get_scheduler(self, conf: NotifyConfig, redis: Redis) -> ReminderScheduler:
+        return ReminderScheduler(
+            redis,
+            conf.scheduler_batch_size,
+            conf.scheduler_poll_interval,
+            conf.scheduler_lease,
+            conf.coalesce_window
+        )
+
+    @provide
+    async def get_sender(self, conf: NotifyConfig, bot: Bot) -> AsyncIterable[TelegramSender]:
+        sender = TelegramSender(bot, conf.sender_concurrency)
+        sender.start()
+        yield sender
+        await sender.close()
 
-    redis_bot_storage = provide(AsyncRedisBotStorage, provides=AsyncStorageInterface, scope=Scope.REQUEST)
+    redis_bot_storage = provide(AsyncRedisBotStorage, provides=AsyncStorageInterface)
+
+    @provide
+    async def get_profile_cache(
+        self,
+        conf: BotConfig,
+        storage: AsyncStorageInterface,
+        redis: Redis
+    ) -> AsyncIterable[ProfileCacheInterface]:
+        cache = ProfileCache(storage, redis, conf.profile_cache_ttl, conf.profile_cache_size)
+        cache.start()
+        yield cache
+        await cache.close()
 
     @provide
     def fsm_storage(self, redis: Redis) -> RedisStorage:
         return RedisStorage(redis=redis)
 
     @provide
-    def get_bot(self, conf: BotConfig) -> Bot:
-        return Bot(conf.bot_token)
+    def get_rate_limiter(self, conf: BotConfig, redis: Redis) -> AsyncRedisRateLimiter:
+        return AsyncRedisRateLimiter(
+            redis,
+            conf.rate_limit_global,
+            conf.rate_limit_global_burst,
+            conf.rate_limit_chat,
+            conf.rate_limit_chat_burst,
+            conf.rate_limit_reserve
+        )
+
+    @provide
+    def get_bot(self, conf: BotConfig, limiter: AsyncRedisRateLimiter) -> Bot:
+        bot = Bot(conf.bot_token)
+        if conf.rate_limit_enabled:
+            bot.session.middleware(RateLimitRequestMiddleware(limiter))
+        return bot
+
+    in_flight = provide(InFlightMiddleware)
+
+    @provide
+    def get_user_queue(self, conf: BotConfig) -> UserQueueMiddleware:
+        return UserQueueMiddleware(conf.dispatch_concurrency, conf.dispatch_max_in_flight)
 
     @provide
-    def get_dispatcher(self, storage: RedisStorage) -> Dispatcher:
-        dispatcher = Dispatcher(storage=storage)
+    def get_dispatcher(
+        self,
+        conf: BotConfig,
+        storage: RedisStorage,
+        profiles: ProfileCacheInterface,
+        bot_storage: AsyncStorageInterface,
+        in_flight: InFlightMiddleware,
+        user_queue: UserQueueMiddleware
+    ) -> Dispatcher:
+        if conf.dispatch_mode == "concurrent":
+            dispatcher = Dispatcher(storage=storage)
+            dispatcher.update.outer_middleware(in_flight)
+        else:
+            # The redis lock keeps one user's updates in order across bot instances
+            dispatcher = Dispatcher(storage=storage, events_isolation=storage.create_isolation())
+            # Queueing has to happen before the FSM middleware takes the lock, which does not keep arrival order
+            dispatcher.update.outer_middleware.unregister(dispatcher.fsm)
+            dispatcher.update.outer_middleware(in_flight)
+            dispatcher.update.outer_middleware(user_queue)
+            dispatcher.update.outer_middleware(dispatcher.fsm)
+        dispatcher.message.outer_middleware(UserProfileMiddleware(profiles, bot_storage))
+        dispatcher.callback_query.outer_middleware(UserProfileMiddleware(profiles, bot_storage))
         dispatcher.message.middleware(HandleErrorMiddleware())
         dispatcher.callback_query.middleware(HandleErrorMiddleware())
         return dispatcher
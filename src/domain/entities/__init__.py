@@ -1 +1,2 @@
 from .task import Task, TaskPreview
+from .user import UserProfile
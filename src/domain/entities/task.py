@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     title: str
     deadline: datetime
@@ -14,7 +14,7 @@ class Task:
     pass_date: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskPreview:
     id: int
     title: str
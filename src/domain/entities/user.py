@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Optional
+
+
+@dataclass(slots=True)
+class UserProfile:
+    tz: Optional[timezone] = None
+    registered: bool = False
+    chat_id: Optional[int] = None
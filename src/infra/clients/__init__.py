@@ -1,3 +1,5 @@
 from .backend import HttpBackendClient
+from .cached_backend import CachedBackendClient
+from .coalescing_backend import CoalescingBackendClient
 from .country import CountryClient
-from .timezone import HttpTZClient
+from .timezone import HttpTZClient, ZoneInfoTZClient, RedisTZCache
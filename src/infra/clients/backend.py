@@ -1,12 +1,13 @@
 # mypy: disable-error-code=return-value
 import httpx
-from typing import Union, Optional, Literal, TypeVar
+from typing import Union, Optional, Literal, TypeVar, Callable, Any
 from datetime import datetime
 
 from src.application.interfaces.clients import BackendClientInterface, BackendResponse
 from src.application.interfaces.services import TokenServiceInterface
-from src.application.dto.task import TaskViewSchema
+from src.application.dto.task import decode_task, tasks_page_adapter
 from src.domain.entities import Task, TaskPreview
+from src.infra.clients.resilience import BackendGuard
 from src.logger import logger
 
 
@@ -47,23 +48,39 @@ class URIs:
 class HttpBackendClient(BackendClientInterface):
     def __init__(
         self,
-        base_url: str,
+        client: httpx.AsyncClient,
         token_service: TokenServiceInterface,
+        guard: BackendGuard
     ):
-        self._base_url = base_url
+        self._client = client
         self._token_service = token_service
+        self._guard = guard
         self._uris = URIs()
 
-    def _client(self):
-        return httpx.AsyncClient(base_url=self._base_url)
+    def _auth(self, tg_name: str) -> dict[str, str]:
+        return {"Cookie": f"token={self._token_service.generate_token(tg_name)}"}
 
-    def _auth_client(self, tg_name: str):
-        cl = self._client()
-        cl.cookies.update({"token": self._token_service.generate_token(tg_name)})
-        return cl
-
-    def _handle_response(self, response: httpx.Response) -> BackendResponse[Union[str, dict, list, bool, None]]:
-        if response.status_code == 401:
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        tg_name: Optional[str] = None,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        async def send(timeout: float) -> httpx.Response:
+            headers = self._auth(tg_name) if tg_name else None
+            return await self._client.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        return await self._guard.call(endpoint, send, idempotent=method == "GET")
+
+    def _handle_response(
+        self,
+        response: Optional[httpx.Response],
+        decode: Optional[Callable[[bytes], Any]] = None
+    ) -> BackendResponse[Union[str, dict, list, bool, None]]:
+        if response is None:
+            return False, "Service is temporarily unavailable. Try later"
+        elif response.status_code == 401:
             return False, "Unable to recognize you. Try again or write to support"
         elif response.status_code == 403:
             return False, "You don't have permissions for this move. Try again or write to support"
@@ -72,16 +89,16 @@ class HttpBackendClient(BackendClientInterface):
         elif response.status_code == 400:
             return False, response.json().get("detail")
         elif response.status_code == 200:
-            return True, response.json()
+            return True, decode(response.content) if decode else response.json()
         else:
             return False, "Unexpected error. Try later or write to support"
 
     async def register(self, tg_name: str) -> BackendResponse[Optional[str]]:
-        resp = await self._client().post(self._uris.register, json={"tg_name": tg_name})
+        resp = await self._request("register", "POST", self._uris.register, json={"tg_name": tg_name})
         return self._handle_response(resp)
 
     async def check_registered(self, tg_name: str) -> BackendResponse[bool]:
-        resp = await self._client().get(self._uris.check_registered, params={"tg_name": tg_name})
+        resp = await self._request("check_registered", "GET", self._uris.check_registered, params={"tg_name": tg_name})
         return self._handle_response(resp)
 
     async def create_task(
@@ -92,35 +109,34 @@ class HttpBackendClient(BackendClientInterface):
         deadline: datetime,
         parent_id: Optional[int] = None
     ) -> BackendResponse[Task]:
-        resp = await self._auth_client(tg_name).post(self._uris.tasks, json={
+        resp = await self._request("create_task", "POST", self._uris.tasks, tg_name, json={
             "title": title,
             "description": description,
             "deadline": deadline.isoformat(),
             "parent_id": parent_id
         })
-        ok, data = self._handle_response(resp)
-        return ok, Task(**TaskViewSchema.model_validate(data).model_dump()) if ok else data
+        return self._handle_response(resp, decode_task)
 
     async def _get_paginated_tasks(
         self,
+        endpoint: str,
         url: str,
         tg_name: str,
         page: int,
         size: int,
         params: dict = {},
     ) -> BackendResponse[tuple[int, int, list[TaskPreview]]]:
-        resp = await self._auth_client(tg_name).get(
+        resp = await self._request(
+            endpoint,
+            "GET",
             url,
+            tg_name,
             params={"page": page, "size": size, **params}
         )
-        ok, data = self._handle_response(resp)
+        ok, data = self._handle_response(resp, tasks_page_adapter.validate_json)
         if not ok:
             return False, data
-        return True, (
-            data["prev_page"],  # type: ignore
-            data["next_page"],  # type: ignore
-            [TaskPreview(**task_data) for task_data in data["tasks"]],  # type: ignore
-        )
+        return True, (data.prev_page, data.next_page, data.tasks)  # type: ignore
 
     async def get_tasks(
         self,
@@ -129,15 +145,11 @@ class HttpBackendClient(BackendClientInterface):
         page: int = 1,
         size: int = 5
     ) -> BackendResponse[tuple[int, int, list[TaskPreview]]]:
-        return await self._get_paginated_tasks(self._uris.tasks, tg_name, page, size, {"status": status})
+        return await self._get_paginated_tasks("get_tasks", self._uris.tasks, tg_name, page, size, {"status": status})
 
     async def get_task(self, tg_name: str, task_id: int) -> BackendResponse[Task]:
-        resp = await self._auth_client(tg_name).get(self._uris.task_info(task_id))
-        ok, data = self._handle_response(resp)
-        if not ok:
-            return False, data
-        model = TaskViewSchema.model_validate(data)
-        return True, Task(**model.model_dump())
+        resp = await self._request("get_task", "GET", self._uris.task_info(task_id), tg_name)
+        return self._handle_response(resp, decode_task)
 
     async def get_subtasks(
         self,
@@ -147,10 +159,10 @@ class HttpBackendClient(BackendClientInterface):
         page: int = 1,
         size: int = 5
     ) -> BackendResponse[tuple[int, int, list[TaskPreview]]]:
-        return await self._get_paginated_tasks(self._uris.subtasks(parent_id), tg_name, page, size, params={"status": status})
+        return await self._get_paginated_tasks("get_subtasks", self._uris.subtasks(parent_id), tg_name, page, size, params={"status": status})
 
     async def delete_task(self, tg_name: str, task_id: int) -> BackendResponse[list[int]]:
-        resp = await self._auth_client(tg_name).delete(self._uris.task_info(task_id))
+        resp = await self._request("delete_task", "DELETE", self._uris.task_info(task_id), tg_name)
         ok, res = self._handle_response(resp)
         if not ok:
             return ok, res
@@ -171,21 +183,24 @@ class HttpBackendClient(BackendClientInterface):
             data["description"] = description
         if deadline:
             data["deadline"] = deadline.isoformat()
-        resp = await self._auth_client(tg_name).patch(self._uris.task_info(task_id), json=data)
-        ok, data = self._handle_response(resp)
-        return ok, Task(**TaskViewSchema.model_validate(data).model_dump()) if ok else data
+        resp = await self._request("update_task", "PATCH", self._uris.task_info(task_id), tg_name, json=data)
+        return self._handle_response(resp, decode_task)
 
     async def finish_task(self, tg_name: int, task_id: int) -> BackendResponse[None]:
-        resp = await self._auth_client(tg_name).patch(self._uris.finish_task(task_id))
+        resp = await self._request("finish_task", "PATCH", self._uris.finish_task(task_id), tg_name)
         return self._handle_response(resp)
 
     async def force_finish_task(self, tg_name: int, task_id: int) -> BackendResponse[None]:
-        resp = await self._auth_client(tg_name).patch(self._uris.force_finish_task(task_id))
+        resp = await self._request("force_finish_task", "PATCH", self._uris.force_finish_task(task_id), tg_name)
         ok, res = self._handle_response(resp)
         if not ok:
             return ok, res
         return ok, res["subtasks_ids"]
 
     async def check_task_active(self, tg_name: str, task_id: int) -> BackendResponse[bool]:
-        resp = await self._auth_client(tg_name).get(self._uris.check_task_active(task_id))
+        resp = await self._request("check_task_active", "GET", self._uris.check_task_active(task_id), tg_name)
+        return self._handle_response(resp)
+
+    async def get_parent_id(self, tg_name: str, task_id: int) -> BackendResponse[Optional[int]]:
+        resp = await self._request("get_parent_id", "GET", self._uris.get_parent_id(task_id), tg_name)
         return self._handle_response(resp)
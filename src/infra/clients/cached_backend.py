@@ -0,0 +1,167 @@
+from typing import Optional, Literal
+from datetime import datetime
+
+from src.application.interfaces.clients import BackendClientInterface, BackendResponse
+from src.application.interfaces import TaskCacheInterface, TasksPage
+from src.domain.entities import Task
+from src.infra.prefetch import Prefetcher
+
+
+class CachedBackendClient(BackendClientInterface):
+    def __init__(
+        self,
+        backend: BackendClientInterface,
+        cache: TaskCacheInterface,
+        prefetcher: Optional[Prefetcher] = None
+    ):
+        self._backend = backend
+        self._cache = cache
+        self._prefetcher = prefetcher
+
+    async def _parent_of(self, tg_name: str, task_id: int) -> Optional[list[Optional[int]]]:
+        task = await self._cache.get_task(tg_name, task_id)
+        return [task.parent_id] if task else None
+
+    async def register(self, tg_name: str) -> BackendResponse[Optional[str]]:
+        return await self._backend.register(tg_name)
+
+    async def check_registered(self, tg_name: str) -> BackendResponse[bool]:
+        return await self._backend.check_registered(tg_name)
+
+    async def create_task(
+        self,
+        tg_name: str,
+        title: str,
+        description: str,
+        deadline: datetime,
+        parent_id: Optional[int] = None
+    ) -> BackendResponse[Task]:
+        ok, res = await self._backend.create_task(tg_name, title, description, deadline, parent_id)
+        if ok:
+            await self._cache.invalidate_pages(tg_name, [parent_id])
+            await self._cache.set_task(tg_name, res)
+        return ok, res
+
+    async def get_task(self, tg_name: str, task_id: int) -> BackendResponse[Task]:
+        task = await self._cache.get_task(tg_name, task_id)
+        if task:
+            return True, task
+        # Read before fetching, a write finishing meanwhile makes the result too old to cache
+        generation = await self._cache.generation(tg_name)
+        ok, res = await self._backend.get_task(tg_name, task_id)
+        if ok:
+            await self._cache.set_task(tg_name, res, generation)
+        return ok, res
+
+    async def _fill_page(self, tg_name: str, parent_id: Optional[int], key: str, fetch) -> None:
+        # has_page is not counted, the hit rate only covers pages users asked for
+        if await self._cache.has_page(tg_name, parent_id, key):
+            return
+        generation = await self._cache.generation(tg_name)
+        ok, res = await fetch()
+        if ok:
+            await self._cache.set_page(tg_name, parent_id, key, res, generation)
+            self._prefetcher.filled((tg_name, parent_id, key))
+
+    async def _get_page(
+        self,
+        tg_name: str,
+        parent_id: Optional[int],
+        status: str,
+        page: int,
+        size: int,
+        fetch
+    ) -> BackendResponse[TasksPage]:
+        key = f"{status}:{page}:{size}"
+        res = await self._cache.get_page(tg_name, parent_id, key)
+        ok = bool(res)
+        if ok and self._prefetcher:
+            self._prefetcher.served((tg_name, parent_id, key))
+        if not ok:
+            generation = await self._cache.generation(tg_name)
+            ok, res = await fetch(page)
+            if ok:
+                await self._cache.set_page(tg_name, parent_id, key, res, generation)
+        if ok and self._prefetcher:
+            for neighbour in self._prefetcher.neighbours(res[0], res[1]):
+                self._prefetcher.schedule(
+                    lambda neighbour=neighbour: self._fill_page(
+                        tg_name, parent_id, f"{status}:{neighbour}:{size}", lambda: fetch(neighbour)
+                    )
+                )
+        return ok, res
+
+    async def get_tasks(
+        self,
+        tg_name: str,
+        status: Literal["active", "finished"],
+        page: int = 1,
+        size: int = 5
+    ) -> BackendResponse[TasksPage]:
+        return await self._get_page(
+            tg_name, None, status, page, size,
+            lambda page: self._backend.get_tasks(tg_name, status, page, size)
+        )
+
+    async def get_subtasks(
+        self,
+        tg_name: str,
+        status: Literal["active", "finished"],
+        parent_id: int,
+        page: int = 1,
+        size: int = 5
+    ) -> BackendResponse[TasksPage]:
+        return await self._get_page(
+            tg_name, parent_id, status, page, size,
+            lambda page: self._backend.get_subtasks(tg_name, status, parent_id, page, size)
+        )
+
+    async def delete_task(self, tg_name: str, task_id: int) -> BackendResponse[list[int]]:
+        parent = await self._parent_of(tg_name, task_id)
+        ok, res = await self._backend.delete_task(tg_name, task_id)
+        if ok:
+            await self._cache.invalidate_tasks(tg_name, [task_id, *res])
+            await self._cache.invalidate_pages(tg_name, parent)
+        return ok, res
+
+    async def update_task(
+        self,
+        tg_name: str,
+        task_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        deadline: Optional[datetime] = None
+    ) -> BackendResponse[Task]:
+        ok, res = await self._backend.update_task(tg_name, task_id, title, description, deadline)
+        if ok:
+            await self._cache.invalidate_pages(tg_name, [res.parent_id])
+            await self._cache.set_task(tg_name, res)
+        return ok, res
+
+    async def finish_task(self, tg_name: int, task_id: int) -> BackendResponse[None]:
+        parent = await self._parent_of(tg_name, task_id)
+        ok, res = await self._backend.finish_task(tg_name, task_id)
+        if ok:
+            await self._cache.invalidate_tasks(tg_name, [task_id])
+            await self._cache.invalidate_pages(tg_name, parent)
+        return ok, res
+
+    async def force_finish_task(self, tg_name: int, task_id: int) -> BackendResponse[list[int]]:
+        parent = await self._parent_of(tg_name, task_id)
+        ok, res = await self._backend.force_finish_task(tg_name, task_id)
+        if ok:
+            await self._cache.invalidate_tasks(tg_name, [task_id, *res])
+            await self._cache.invalidate_pages(tg_name, parent)
+        return ok, res
+
+    async def check_task_active(self, tg_name: str, task_id: int) -> BackendResponse[bool]:
+        task = await self._cache.get_task(tg_name, task_id)
+        if task:
+            return True, task.pass_date is None
+        return await self._backend.check_task_active(tg_name, task_id)
+
+    async def get_parent_id(self, tg_name: int, task_id: int) -> BackendResponse[Optional[int]]:
+        task = await self._cache.get_task(tg_name, task_id)
+        if task:
+            return True, task.parent_id
+        return await self._backend.get_parent_id(tg_name, task_id)
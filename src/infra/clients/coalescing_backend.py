@@ -0,0 +1,104 @@
+from typing import Awaitable, Optional, Literal, TypeVar
+from datetime import datetime
+
+from src.application.interfaces.clients import BackendClientInterface, BackendResponse
+from src.domain.entities import Task, TaskPreview
+from src.infra.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+
+class CoalescingBackendClient(BackendClientInterface):
+    def __init__(self, backend: BackendClientInterface, flights: SingleFlight):
+        self._backend = backend
+        self._flights = flights
+
+    async def _write(self, tg_name: str, call: Awaitable[BackendResponse[T]]) -> BackendResponse[T]:
+        # Reads joining a flight that started before the write would get the old value
+        try:
+            return await call
+        finally:
+            self._flights.forget(tg_name)
+
+    async def register(self, tg_name: str) -> BackendResponse[Optional[str]]:
+        return await self._write(tg_name, self._backend.register(tg_name))
+
+    async def check_registered(self, tg_name: str) -> BackendResponse[bool]:
+        return await self._flights.do(
+            ("check_registered", tg_name),
+            lambda: self._backend.check_registered(tg_name)
+        )
+
+    async def create_task(
+        self,
+        tg_name: str,
+        title: str,
+        description: str,
+        deadline: datetime,
+        parent_id: Optional[int] = None
+    ) -> BackendResponse[Task]:
+        return await self._write(tg_name, self._backend.create_task(tg_name, title, description, deadline, parent_id))
+
+    async def get_task(self, tg_name: str, task_id: int) -> BackendResponse[Task]:
+        return await self._flights.do(
+            ("get_task", tg_name, task_id),
+            lambda: self._backend.get_task(tg_name, task_id)
+        )
+
+    async def get_tasks(
+        self,
+        tg_name: str,
+        status: Literal["active", "finished"],
+        page: int = 1,
+        size: int = 5
+    ) -> BackendResponse[tuple[int, int, list[TaskPreview]]]:
+        return await self._flights.do(
+            ("get_tasks", tg_name, status, page, size),
+            lambda: self._backend.get_tasks(tg_name, status, page, size)
+        )
+
+    async def get_subtasks(
+        self,
+        tg_name: str,
+        status: Literal["active", "finished"],
+        parent_id: int,
+        page: int = 1,
+        size: int = 5
+    ) -> BackendResponse[tuple[int, int, list[TaskPreview]]]:
+        return await self._flights.do(
+            ("get_subtasks", tg_name, status, parent_id, page, size),
+            lambda: self._backend.get_subtasks(tg_name, status, parent_id, page, size)
+        )
+
+    async def delete_task(self, tg_name: str, task_id: int) -> BackendResponse[list[int]]:
+        return await self._write(tg_name, self._backend.delete_task(tg_name, task_id))
+
+    async def update_task(
+        self,
+        tg_name: str,
+        task_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        deadline: Optional[datetime] = None
+    ) -> BackendResponse[Task]:
+        return await self._write(
+            tg_name, self._backend.update_task(tg_name, task_id, title, description, deadline)
+        )
+
+    async def finish_task(self, tg_name: int, task_id: int) -> BackendResponse[None]:
+        return await self._write(tg_name, self._backend.finish_task(tg_name, task_id))
+
+    async def force_finish_task(self, tg_name: int, task_id: int) -> BackendResponse[list[int]]:
+        return await self._write(tg_name, self._backend.force_finish_task(tg_name, task_id))
+
+    async def check_task_active(self, tg_name: str, task_id: int) -> BackendResponse[bool]:
+        return await self._flights.do(
+            ("check_task_active", tg_name, task_id),
+            lambda: self._backend.check_task_active(tg_name, task_id)
+        )
+
+    async def get_parent_id(self, tg_name: int, task_id: int) -> BackendResponse[Optional[int]]:
+        return await self._flights.do(
+            ("get_parent_id", tg_name, task_id),
+            lambda: self._backend.get_parent_id(tg_name, task_id)
+        )
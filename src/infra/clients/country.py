@@ -1,16 +1,121 @@
+import re
+import unicodedata
 from typing import Optional
 
-from pycountry import countries
+from pycountry import countries, subdivisions
 
 from src.application.interfaces.clients import CountryClientInterface
 
 
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[\W_]+", " ", text.lower()).split())
+
+
+# Common names and codes users type that pycountry does not list
+_ALIASES = {
+    "uk": "GB",
+    "u k": "GB",
+    "u s": "US",
+    "u s a": "US",
+    "ksa": "SA",
+    "drc": "CD",
+    "prc": "CN",
+    "dprk": "KP",
+    "britain": "GB",
+    "great britain": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "uae": "AE",
+    "emirates": "AE",
+    "holland": "NL",
+    "america": "US",
+    "russia": "RU",
+    "ivory coast": "CI",
+    "burma": "MM",
+    "swaziland": "SZ",
+}
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
 class CountryClient(CountryClientInterface):
+    def __init__(self, min_score: float = 0.5, min_gap: float = 0.1):
+        self._min_score = min_score
+        self._min_gap = min_gap
+        self._exact: dict[str, Optional[str]] = {}
+        self._display: dict[str, str] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._name_grams: dict[str, set[str]] = {}
+        self._name_codes: dict[str, str] = {}
+        for country in countries:
+            code = country.alpha_2
+            self._display[code] = getattr(country, "common_name", None) or country.name
+            for name in (
+                country.name,
+                getattr(country, "official_name", None),
+                getattr(country, "common_name", None),
+                code,
+                country.alpha_3
+            ):
+                if name:
+                    self._add_name(_normalize(name), code, fuzzy=len(name) > 3)
+        for subdivision in subdivisions:
+            key = _normalize(subdivision.name)
+            if key in self._exact and self._exact[key] != subdivision.country_code:
+                if key not in self._name_codes:
+                    self._exact[key] = None
+                continue
+            self._exact[key] = subdivision.country_code
+        self._exact.update(_ALIASES)
+
+    def _add_name(self, key: str, code: str, fuzzy: bool):
+        self._exact[key] = code
+        if not fuzzy or key in self._name_codes:
+            return
+        self._name_codes[key] = code
+        grams = _trigrams(key)
+        self._name_grams[key] = grams
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(key)
+
+    def _rank(self, key: str) -> list[tuple[str, float]]:
+        grams = _trigrams(key)
+        overlaps: dict[str, int] = {}
+        for gram in grams:
+            for name in self._grams.get(gram, ()):
+                overlaps[name] = overlaps.get(name, 0) + 1
+        scores: dict[str, float] = {}
+        for name, overlap in overlaps.items():
+            score = 2 * overlap / (len(grams) + len(self._name_grams[name]))
+            # Short keys only count as a match at the start of a word, "uk" must not mean Ukraine by accident
+            if len(key) >= 4 and key in name or name.startswith(key) or f" {key}" in name:
+                score = max(score, 0.9)
+            code = self._name_codes[name]
+            scores[code] = max(scores.get(code, 0.0), score)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
     def get_country_code_by_name(self, country_name: str) -> Optional[str]:
-        try:
-            results = countries.search_fuzzy(country_name)
-        except LookupError:
+        key = _normalize(country_name)
+        if key in self._exact:
+            return self._exact[key]
+        ranked = self._rank(key)
+        if not ranked or ranked[0][1] < self._min_score:
             return None
-        if len(results) != 1:
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < self._min_gap:
             return None
-        return results[0].alpha_2  # type: ignore
+        return ranked[0][0]
+
+    def suggest_countries(self, country_name: str, limit: int = 5) -> list[str]:
+        key = _normalize(country_name)
+        codes = [code for code, score in self._rank(key) if score >= self._min_score * 0.6]
+        # An alias or exact name outranks lookalikes, "uk" has to offer the United Kingdom before Ukraine
+        exact = self._exact.get(key)
+        if exact:
+            codes = [exact, *(code for code in codes if code != exact)]
+        return [self._display[code] for code in codes[:limit]]
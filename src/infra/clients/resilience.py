@@ -0,0 +1,122 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Literal, Optional
+
+import httpx
+
+from src.logger import logger
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> Literal["closed", "open", "half_open"]:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Backend circuit closed")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self._failure_threshold):
+            logger.warning(f"Backend circuit opened after {self._failures} failures")
+            self._opened_at = time.monotonic()
+            self.opened += 1
+        self._probing = False
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, max_tokens: float = 10):
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self.spent = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            self.denied += 1
+            return False
+        self._tokens -= 1
+        self.spent += 1
+        return True
+
+
+class BackendGuard:
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        timeout: float,
+        timeouts: dict[str, float],
+        retries: int,
+        backoff: float
+    ):
+        self.breaker = breaker
+        self.budget = budget
+        self._timeout = timeout
+        self._timeouts = timeouts
+        self._retries = retries
+        self._backoff = backoff
+
+    async def call(
+        self,
+        endpoint: str,
+        send: Callable[[float], Awaitable[httpx.Response]],
+        idempotent: bool = False
+    ) -> Optional[httpx.Response]:
+        if not self.breaker.allow():
+            return None
+        self.budget.deposit()
+        timeout = self._timeouts.get(endpoint, self._timeout)
+        attempt = 0
+        while True:
+            resp = None
+            try:
+                resp = await send(timeout)
+                if resp.status_code < 500:
+                    self.breaker.record_success()
+                    return resp
+            except httpx.TransportError as e:
+                logger.warning(f"Backend call '{endpoint}' failed: {e!r}")
+            except BaseException:
+                self.breaker.release()
+                raise
+            if not idempotent or attempt >= self._retries or not self.budget.withdraw():
+                self.breaker.record_failure()
+                return resp
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, self._backoff * 2 ** attempt))
@@ -1,6 +1,15 @@
+import json
+from datetime import datetime, timezone
+from importlib.resources import files
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
 import httpx
+from redis.asyncio import Redis
 
 from src.application.interfaces.clients import TimezoneClientInterface
+from src.logger import logger
 
 
 class HttpTZClient(TimezoneClientInterface):
@@ -9,11 +18,64 @@ class HttpTZClient(TimezoneClientInterface):
         self._url = url
 
     async def get_country_tz_offsets_minutes(self, country_code: str) -> list[int]:
-        client = httpx.AsyncClient()
-        resp = await client.get(self._url, params={"key": self._key, "format": "json", "country": country_code})
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(self._url, params={"key": self._key, "format": "json", "country": country_code})
         if resp.status_code != 200:
             return []
         offsets = set()
         for zone_data in resp.json()["zones"]:
             offsets.add(zone_data["gmtOffset"])
         return [offset // 60 for offset in sorted(offsets)]
+
+
+class RedisTZCache(TimezoneClientInterface):
+    def __init__(self, client: TimezoneClientInterface, redis: Redis, ttl: int):
+        self._client = client
+        self._redis = redis
+        self._ttl = ttl
+
+    async def get_country_tz_offsets_minutes(self, country_code: str) -> list[int]:
+        key = f"tz_offsets:{country_code.upper()}"
+        cached = await self._redis.get(key)
+        if cached:
+            return json.loads(cached)
+        offsets = await self._client.get_country_tz_offsets_minutes(country_code)
+        if offsets:
+            await self._redis.set(key, json.dumps(offsets), ex=self._ttl)
+        return offsets
+
+
+def _read_zone_tab() -> str:
+    try:
+        return (files("tzdata.zoneinfo") / "zone.tab").read_text()
+    except (ModuleNotFoundError, FileNotFoundError):
+        return Path("/usr/share/zoneinfo/zone.tab").read_text()
+
+
+def _build_country_zones() -> dict[str, tuple[ZoneInfo, ...]]:
+    index: dict[str, list[ZoneInfo]] = {}
+    for line in _read_zone_tab().splitlines():
+        if not line or line.startswith("#"):
+            continue
+        country_code, _, zone_name = line.split("\t")[:3]
+        index.setdefault(country_code, []).append(ZoneInfo(zone_name))
+    return {country_code: tuple(zones) for country_code, zones in index.items()}
+
+
+class ZoneInfoTZClient(TimezoneClientInterface):
+    def __init__(self, fallback: Optional[TimezoneClientInterface] = None):
+        try:
+            self._zones = _build_country_zones()
+        except OSError as e:
+            logger.error(f"Unable to build offline timezone index: {e}")
+            self._zones = {}
+        self._fallback = fallback
+
+    async def get_country_tz_offsets_minutes(self, country_code: str) -> list[int]:
+        zones = self._zones.get(country_code.upper())
+        if not zones:
+            if self._fallback:
+                return await self._fallback.get_country_tz_offsets_minutes(country_code)
+            return []
+        now = datetime.now(timezone.utc)
+        return sorted({int(now.astimezone(zone).utcoffset().total_seconds()) // 60 for zone in zones})  # type: ignore
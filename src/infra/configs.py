@@ -1,22 +1,98 @@
+from typing import Literal, Optional
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
 class BotConfig(BaseSettings):
     bot_token: str
     base_api_url: str
-    timezone_db_api_key: str
-    timezone_db_url: str
+    timezone_source: Literal["offline", "http"] = "offline"
+    timezone_db_api_key: Optional[str] = None
+    timezone_db_url: Optional[str] = None
+    timezone_cache_ttl: int = 21600
     secret: str
     bot_send_message_base_url: str
+    bot_mode: Literal["polling", "webhook"] = "polling"
+    webhook_url: Optional[str] = None
+    webhook_path: str = "/webhook"
+    webhook_secret: Optional[str] = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    shutdown_timeout: float = 30.0
+    bot_workers: int = 1
+    dispatch_mode: Literal["concurrent", "per_user"] = "per_user"
+    dispatch_concurrency: int = 64
+    dispatch_max_in_flight: int = 1000
+    stats_interval: float = 60.0
+    backend_max_connections: int = 100
+    backend_max_keepalive_connections: int = 20
+    backend_keepalive_expiry: float = 30.0
+    backend_http2: bool = False
+    backend_timeout: float = 5.0
+    backend_timeouts: dict[str, float] = {}
+    backend_retries: int = 2
+    backend_retry_backoff: float = 0.1
+    backend_retry_budget_ratio: float = 0.2
+    backend_breaker_threshold: int = 5
+    backend_breaker_reset_timeout: float = 30.0
+    token_lifetime: int = 5
+    token_refresh_margin: int = 1
+    token_cache_size: int = 1024
+    task_cache: Literal["none", "memory", "redis"] = "memory"
+    task_cache_ttl: int = 30
+    task_cache_size: int = 4096
+    prefetch_pages: Literal["none", "next", "both"] = "none"
+    prefetch_concurrency: int = 4
+    profile_cache_size: int = 4096
+    profile_cache_ttl: int = 300
+    rate_limit_enabled: bool = True
+    rate_limit_global: float = 30.0
+    rate_limit_global_burst: int = 30
+    rate_limit_chat: float = 1.0
+    rate_limit_chat_burst: int = 3
+    rate_limit_reserve: int = 5
+
+    @model_validator(mode="after")
+    def shared_cache_for_webhook(self):
+        # Webhook replicas sit behind a load balancer, a per-process cache would serve other replicas' stale tasks
+        if self.bot_mode == "webhook" and "task_cache" not in self.model_fields_set:
+            self.task_cache = "redis"
+        return self
 
     @property
     def bot_send_message_url(self):
         return self.bot_send_message_base_url + self.bot_token + "/sendMessage"
 
 
+class NotifyConfig(BaseSettings):
+    notify_backend: Literal["celery", "redis"] = "celery"
+    notify_cancel: Literal["revoke", "tombstone"] = "tombstone"
+    scheduler_batch_size: int = 500
+    scheduler_poll_interval: float = 1.0
+    scheduler_lease: float = 60.0
+    scheduler_handoff: Literal["sender", "celery"] = "sender"
+    sender_concurrency: int = 20
+    coalesce_window: float = 0.0
+    coalesce_max: int = 10
+
+
+class CeleryConfig(BaseSettings):
+    celery_profile: Literal["dev", "prod"] = "dev"
+    celery_visibility_timeout: int = 2 * 3600
+
+    @property
+    def max_eta(self) -> int:
+        # The dev profile keeps the transport's default visibility timeout of one hour
+        timeout = self.celery_visibility_timeout if self.celery_profile == "prod" else 3600
+        return timeout // 2
+
+
 class RedisConfig(BaseSettings):
     redis_host: str
     redis_password: str
+    redis_max_connections: int = 100
+    redis_pool_timeout: float = 5.0
 
     @property
     def conn_url(self):
@@ -0,0 +1,56 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Literal
+
+from src.logger import logger
+
+_MAX_TRACKED = 4096
+
+
+class Prefetcher:
+    def __init__(self, mode: Literal["none", "next", "both"], concurrency: int):
+        self._mode = mode
+        self._concurrency = concurrency
+        self._tasks: set[asyncio.Task] = set()
+        # Pages loaded ahead and not shown yet, to count how many reads they answered
+        self._filled: OrderedDict[Hashable, None] = OrderedDict()
+        self.scheduled = 0
+        self.skipped = 0
+        self.used = 0
+
+    def neighbours(self, prev_page: int, next_page: int) -> list[int]:
+        if self._mode == "none":
+            return []
+        pages = [next_page]
+        if self._mode == "both":
+            pages.append(prev_page)
+        return [page for page in pages if page]
+
+    def schedule(self, fn: Callable[[], Awaitable[None]]) -> None:
+        if len(self._tasks) >= self._concurrency:
+            self.skipped += 1
+            return
+        self.scheduled += 1
+        task = asyncio.create_task(fn())
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def filled(self, key: Hashable) -> None:
+        self._filled[key] = None
+        while len(self._filled) > _MAX_TRACKED:
+            self._filled.popitem(last=False)
+
+    def served(self, key: Hashable) -> None:
+        if key in self._filled:
+            del self._filled[key]
+            self.used += 1
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Page prefetch failed: {task.exception()}")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.application.interfaces import AsyncStorageInterface, ProfileCacheInterface
+from src.domain.entities import UserProfile
+from src.infra.redis_storage import PROFILE_CHANNEL
+from src.logger import logger
+
+
+class ProfileCache(ProfileCacheInterface):
+    def __init__(self, storage: AsyncStorageInterface, redis: Redis, ttl: int, max_size: int):
+        self._storage = storage
+        self._redis = redis
+        self._ttl = ttl
+        self._max_size = max_size
+        # Each entry keeps the user's generation, bumped by invalidation so a load racing with it is not cached.
+        # An invalidated user keeps an entry without a profile, evicted users read the highest evicted generation.
+        self._entries: OrderedDict[str, tuple[float, Optional[UserProfile], int]] = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+        self._listener: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        storage.on_profile_change(self.invalidate)
+
+    def _generation(self, tg_name: str) -> int:
+        entry = self._entries.get(tg_name)
+        return entry[2] if entry else self._floor
+
+    def _put(self, tg_name: str, entry: tuple[float, Optional[UserProfile], int]) -> None:
+        self._entries[tg_name] = entry
+        self._entries.move_to_end(tg_name)
+        while len(self._entries) > self._max_size:
+            self._floor = max(self._floor, self._entries.popitem(last=False)[1][2])
+
+    async def get(self, tg_name: str) -> UserProfile:
+        entry = self._entries.get(tg_name)
+        if entry and entry[1] is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(tg_name)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        generation = self._generation(tg_name)
+        profile = await self._storage.get_profile(tg_name)
+        if generation == self._generation(tg_name):
+            self._put(tg_name, (time.monotonic() + self._ttl, profile, generation))
+        return profile
+
+    def invalidate(self, tg_name: Optional[str] = None) -> None:
+        self._clock += 1
+        if tg_name is None:
+            self._entries.clear()
+            self._floor = self._clock
+        else:
+            self._put(tg_name, (0.0, None, self._clock))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(PROFILE_CHANNEL)
+                    # Anything published while we were disconnected is lost
+                    self.invalidate()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate(message["data"])
+            except RedisError as e:
+                logger.warning(f"Profile invalidation listener failed: {e!r}")
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
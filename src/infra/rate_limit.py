@@ -0,0 +1,140 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Literal, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+Priority = Literal["high", "low"]
+
+# Outbound calls are interactive unless the caller says otherwise, see TelegramSender
+rate_limit_priority: ContextVar[Priority] = ContextVar("rate_limit_priority", default="high")
+
+_GLOBAL_KEY = "ratelimit:global"
+
+# Two token buckets checked and debited together. Low priority callers must leave
+# `reserve` tokens in the global bucket so interactive replies are never starved.
+# Only they use the per chat bucket, a user paging through lists gets every reply.
+# Returns how many milliseconds to wait before trying again, 0 when a token was taken.
+_ACQUIRE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local g_rate, g_burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local c_rate, c_burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+local reserve = tonumber(ARGV[5])
+local per_chat = ARGV[6] == '1'
+
+local function refill(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    return math.min(burst, tokens + math.max(0, now - ts) * rate)
+end
+
+local g = refill(KEYS[1], g_rate, g_burst)
+local wait = 0
+if g < 1 + reserve then
+    wait = (1 + reserve - g) / g_rate
+end
+local c
+if per_chat then
+    c = refill(KEYS[2], c_rate, c_burst)
+    if c < 1 then
+        wait = math.max(wait, (1 - c) / c_rate)
+    end
+end
+if wait == 0 then
+    g = g - 1
+    if per_chat then
+        c = c - 1
+    end
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(g), 'ts', tostring(now))
+if per_chat then
+    redis.call('HSET', KEYS[2], 'tokens', tostring(c), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[2], math.ceil(c_burst / c_rate * 1000))
+end
+return math.ceil(wait * 1000)
+"""
+
+# Drains the global bucket so the next token is only available after ARGV[2] seconds,
+# called when Telegram answers 429 despite the bucket so every caller honours retry_after.
+_PAUSE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = 1 - tonumber(ARGV[1]) * tonumber(ARGV[2])
+local current = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if current == nil or tokens < current then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+end
+"""
+
+
+class _RateLimiter:
+    def __init__(
+        self,
+        redis: Union[Redis, SyncRedis],
+        global_rate: float,
+        global_burst: int,
+        chat_rate: float,
+        chat_burst: int,
+        reserve: int
+    ):
+        self._script = redis.register_script(_ACQUIRE)
+        self._pause = redis.register_script(_PAUSE)
+        self._rates = [global_rate, global_burst, chat_rate, chat_burst]
+        self._reserve = reserve
+
+    def _call(self, chat_id: Union[int, str], priority: Priority):
+        low = priority == "low"
+        return self._script(
+            keys=[_GLOBAL_KEY, f"ratelimit:chat:{chat_id}"],
+            args=[*self._rates, self._reserve if low else 0, int(low)]
+        )
+
+    def _call_pause(self, retry_after: float):
+        return self._pause(keys=[_GLOBAL_KEY], args=[self._rates[0], retry_after])
+
+
+class AsyncRedisRateLimiter(_RateLimiter):
+    async def acquire(self, chat_id: Union[int, str], priority: Priority = "high") -> float:
+        waited = 0.0
+        while wait_ms := await self._call(chat_id, priority):
+            await asyncio.sleep(wait_ms / 1000)
+            waited += wait_ms / 1000
+        return waited
+
+    async def pause(self, retry_after: float) -> None:
+        await self._call_pause(retry_after)
+
+
+class SyncRedisRateLimiter(_RateLimiter):
+    def acquire(self, chat_id: Union[int, str], priority: Priority = "low") -> float:
+        waited = 0.0
+        while wait_ms := self._call(chat_id, priority):
+            time.sleep(wait_ms / 1000)
+            waited += wait_ms / 1000
+        return waited
+
+    def pause(self, retry_after: float) -> None:
+        self._call_pause(retry_after)
+
+
+class RateLimitRequestMiddleware(BaseRequestMiddleware):
+    def __init__(self, limiter: AsyncRedisRateLimiter):
+        self._limiter = limiter
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None:
+            await self._limiter.acquire(chat_id, rate_limit_priority.get())
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            await self._limiter.pause(e.retry_after)
+            raise
@@ -1,89 +1,226 @@
-import json
-from typing import Optional
+from typing import Callable, Optional
 from datetime import timezone, timedelta, datetime
 
 from redis.asyncio import Redis
 from redis import Redis as SyncRedis
+from redis.exceptions import ResponseError
 
 
 from src.logger import logger
 from src.application.interfaces import AsyncStorageInterface, SyncStorageInterface
-
-
-def _to_json(reminders_tab: dict[str, datetime]):
-    return json.dumps({k: v.isoformat() for k, v in reminders_tab.items()})
+from src.domain.entities import UserProfile
+
+# Reminder tabs used to be JSON blobs stored as plain strings. They are hashes now
+# (reminder id -> ISO eta), legacy keys are converted in place on first touch.
+_MIGRATE_TAB = """
+if redis.call('TYPE', KEYS[1]).ok ~= 'string' then
+    return 0
+end
+local tab = cjson.decode(redis.call('GET', KEYS[1]))
+redis.call('DEL', KEYS[1])
+for id, eta in pairs(tab) do
+    redis.call('HSET', KEYS[1], id, eta)
+end
+return 1
+"""
+
+_POP_TABS = """
+local ids = {}
+for _, key in ipairs(KEYS) do
+    local kind = redis.call('TYPE', key).ok
+    if kind == 'hash' then
+        for _, id in ipairs(redis.call('HKEYS', key)) do
+            table.insert(ids, id)
+        end
+    elseif kind == 'string' then
+        for id, _ in pairs(cjson.decode(redis.call('GET', key))) do
+            table.insert(ids, id)
+        end
+    end
+    redis.call('DEL', key)
+end
+return ids
+"""
+
+_POP_BATCH_SIZE = 1000
+
+_MIGRATION_DONE_KEY = "migrations:rms_hash"
+
+PROFILE_CHANNEL = "profile_changed"
+
+
+def _tab_key(tg_name: str, task_id: int) -> str:
+    return f"rms:{tg_name}:{task_id}"
+
+
+def _profile_key(tg_name: str) -> str:
+    return f"user:{tg_name}"
+
+
+def _offset_to_tz(offset) -> Optional[timezone]:
+    if offset is None or offset == "":
+        return None
+    return timezone(timedelta(minutes=int(offset)))
+
+
+def _from_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def _is_wrong_type(e: ResponseError) -> bool:
+    return str(e).startswith("WRONGTYPE")
+
+
+async def migrate_reminder_tabs(redis: Redis, batch_size: int = 500) -> int:
+    if await redis.get(_MIGRATION_DONE_KEY):
+        return 0
+    migrate = redis.register_script(_MIGRATE_TAB)
+    migrated = 0
+    batch: list[str] = []
+    async for key in redis.scan_iter(match="rms:*", count=batch_size, _type="string"):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            migrated += await _migrate_batch(redis, migrate, batch)
+            batch = []
+    if batch:
+        migrated += await _migrate_batch(redis, migrate, batch)
+    await redis.set(_MIGRATION_DONE_KEY, 1)
+    logger.info(f"Migrated {migrated} reminder tabs to hashes")
+    return migrated
+
+
+async def _migrate_batch(redis: Redis, migrate, keys: list[str]) -> int:
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            await migrate(keys=[key], client=pipe)
+        return sum(await pipe.execute())
 
 
 class AsyncRedisBotStorage(AsyncStorageInterface):
     def __init__(self, redis: Redis):
         self._redis = redis
+        self._migrate = redis.register_script(_MIGRATE_TAB)
+        self._pop_tabs = redis.register_script(_POP_TABS)
+        self._profile_listeners: list[Callable[[str], None]] = []
+
+    def on_profile_change(self, callback: Callable[[str], None]) -> None:
+        self._profile_listeners.append(callback)
+
+    async def _on_tab(self, key: str, op):
+        try:
+            return await op()
+        except ResponseError as e:
+            if not _is_wrong_type(e):
+                raise
+            await self._migrate(keys=[key])
+            return await op()
+
+    async def _update_profile(self, tg_name: str, **fields) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_profile_key(tg_name), mapping=fields)
+            pipe.publish(PROFILE_CHANNEL, tg_name)
+            await pipe.execute()
+        # The publish only reaches the other processes in time, this one must not serve the old profile meanwhile
+        for callback in self._profile_listeners:
+            callback(tg_name)
+
+    async def get_profile(self, tg_name: str) -> UserProfile:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(_profile_key(tg_name))
+            pipe.get(f"tz:{tg_name}")
+            profile, legacy_tz = await pipe.execute()
+        if "tz" not in profile and legacy_tz is not None:
+            await self._redis.hset(_profile_key(tg_name), "tz", legacy_tz)
+            profile["tz"] = legacy_tz
+        return UserProfile(
+            tz=_offset_to_tz(profile.get("tz")),
+            registered=profile.get("registered") == "1",
+            chat_id=int(profile["chat_id"]) if profile.get("chat_id") else None
+        )
 
     async def get_tz(self, tg_name: str) -> Optional[timezone]:
-        offset = await self._redis.get(f"tz:{tg_name}")
-        if not offset:
-            return None
-        return timezone(timedelta(minutes=(int(offset))))
+        return (await self.get_profile(tg_name)).tz
 
     async def set_tz(self, tg_name: str, offset: int) -> None:
-        await self._redis.set(f"tz:{tg_name}", offset)
+        await self._update_profile(tg_name, tz=offset)
+
+    async def set_registered(self, tg_name: str) -> None:
+        await self._update_profile(tg_name, registered=1)
+
+    async def set_chat_id(self, tg_name: str, chat_id: int) -> None:
+        await self._update_profile(tg_name, chat_id=chat_id)
 
     async def get_reminders_tab(self, tg_name: str, task_id: int) -> Optional[dict[str, datetime]]:
-        tab = await self._redis.get(f"rms:{tg_name}:{task_id}")
+        key = _tab_key(tg_name, task_id)
+        tab = await self._on_tab(key, lambda: self._redis.hgetall(key))
         if not tab:
             return None
-        decoded = json.loads(tab)
-        return {k: datetime.fromisoformat(v).astimezone(timezone.utc) for k, v in decoded.items()}
+        return {k: _from_iso(v) for k, v in tab.items()}
 
     async def set_reminder(self, tg_name: str, eta: datetime, id_: str, task_id: int) -> None:
-        tab = await self.get_reminders_tab(tg_name, task_id)
-        if not tab:
-            tab = {}
-        tab[id_] = eta.astimezone(timezone.utc)
-        await self._redis.set(f"rms:{tg_name}:{task_id}", _to_json(tab))
+        key = _tab_key(tg_name, task_id)
+        value = eta.astimezone(timezone.utc).isoformat()
+        await self._on_tab(key, lambda: self._redis.hset(key, id_, value))
 
     async def get_reminder(self, tg_name: str, id_: str, task_id: int) -> Optional[datetime]:
-        tab = await self.get_reminders_tab(tg_name, task_id)
-        if not tab:
-            return None
-        return tab.get(id_)
+        key = _tab_key(tg_name, task_id)
+        eta = await self._on_tab(key, lambda: self._redis.hget(key, id_))
+        return _from_iso(eta) if eta else None
 
     async def delete_reminders(self, tg_name: str, reminders_ids: list[str], task_id: int) -> None:
-        tab = await self.get_reminders_tab(tg_name, task_id)
-        if not tab:
+        if not reminders_ids:
             return None
-        for id_ in reminders_ids:
-            tab.pop(id_, None)
-        if not tab:
-            await self._redis.delete(f"rms:{tg_name}:{task_id}")
-        else:
-            await self._redis.set(f"rms:{tg_name}:{task_id}", _to_json(tab))
+        key = _tab_key(tg_name, task_id)
+        await self._on_tab(key, lambda: self._redis.hdel(key, *reminders_ids))
+
+    async def delete_reminders_many(self, tabs: dict[tuple[str, int], list[str]]) -> None:
+        keys = [(_tab_key(tg_name, task_id), ids) for (tg_name, task_id), ids in tabs.items() if ids]
+        if not keys:
+            return None
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, ids in keys:
+                pipe.hdel(key, *ids)
+            results = await pipe.execute(raise_on_error=False)
+        for (key, ids), result in zip(keys, results):
+            if not isinstance(result, ResponseError):
+                continue
+            if not _is_wrong_type(result):
+                raise result
+            await self._migrate(keys=[key])
+            await self._redis.hdel(key, *ids)
 
     async def delete_all_reminders(self, tg_name: str, task_id: int) -> list[str]:
-        tab = await self.get_reminders_tab(tg_name, task_id)
-        if not tab:
-            return []
-        await self._redis.delete(f"rms:{tg_name}:{task_id}")
-        return list(tab.keys())
+        return await self._pop_tabs(keys=[_tab_key(tg_name, task_id)])
+
+    async def delete_all_reminders_many(self, tg_name: str, task_ids: list[int]) -> list[str]:
+        keys = [_tab_key(tg_name, task_id) for task_id in task_ids]
+        removed: list[str] = []
+        for start in range(0, len(keys), _POP_BATCH_SIZE):
+            removed.extend(await self._pop_tabs(keys=keys[start:start + _POP_BATCH_SIZE]))
+        return removed
 
 
 class SyncRedisBotStorage(SyncStorageInterface):
     def __init__(self, redis: SyncRedis):
         self._redis = redis
-
-    def get_reminders_tab(self, tg_name: str, task_id: int) -> Optional[dict[str, datetime]]:
-        tab = self._redis.get(f"rms:{tg_name}:{task_id}")
-        if not tab:
-            return None
-        decoded = json.loads(tab)
-        return {k: datetime.fromisoformat(v).astimezone(timezone.utc) for k, v in decoded.items()}
+        self._migrate = redis.register_script(_MIGRATE_TAB)
+
+    def _on_tab(self, key: str, op):
+        try:
+            return op()
+        except ResponseError as e:
+            if not _is_wrong_type(e):
+                raise
+            self._migrate(keys=[key])
+            return op()
+
+    def get_reminder(self, tg_name: str, id_: str, task_id: int) -> Optional[datetime]:
+        key = _tab_key(tg_name, task_id)
+        eta = self._on_tab(key, lambda: self._redis.hget(key, id_))
+        return _from_iso(eta) if eta else None
 
     def delete_reminders(self, tg_name: str, reminders_ids: list[str], task_id: int) -> None:
-        tab = self.get_reminders_tab(tg_name, task_id)
-        if not tab:
+        if not reminders_ids:
             return None
-        for id_ in reminders_ids:
-            tab.pop(id_, None)
-        if not tab:
-            self._redis.delete(f"rms:{tg_name}:{task_id}")
-        else:
-            self._redis.set(f"rms:{tg_name}:{task_id}", _to_json(tab))
+        key = _tab_key(tg_name, task_id)
+        self._on_tab(key, lambda: self._redis.hdel(key, *reminders_ids))
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.logger import logger
+
+_DUE_KEY = "reminders:due"
+_LEASED_KEY = "reminders:leased"
+_PAYLOADS_KEY = "reminders:payloads"
+_MAX_BACKOFF = 30.0
+
+# Moves due ids (and ids whose lease ran out) into the leased set in one step,
+# so concurrent dispatchers never claim the same reminder twice. ARGV[4] lets ids
+# due shortly after now be claimed early, so they can be coalesced with due ones.
+_CLAIM = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(expired) do
+    redis.call('ZADD', KEYS[1], ARGV[1], id)
+end
+if #expired > 0 then
+    redis.call('ZREM', KEYS[2], unpack(expired))
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[4], 'LIMIT', 0, ARGV[2])
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+    local lease_until = tonumber(ARGV[1]) + tonumber(ARGV[3])
+    for _, id in ipairs(ids) do
+        redis.call('ZADD', KEYS[2], lease_until, id)
+    end
+end
+return ids
+"""
+
+
+@dataclass(slots=True)
+class Reminder:
+    id: str
+    text: str
+    chat_id: int
+    tg_name: str
+    task_id: int
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        redis: Redis,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+        lookahead: float = 0.0
+    ):
+        self._redis = redis
+        self._lookahead = lookahead
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._lease = lease
+        self._claim = redis.register_script(_CLAIM)
+
+    async def schedule(self, reminder: Reminder, eta: datetime) -> None:
+        payload = asdict(reminder)
+        del payload["id"]
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_PAYLOADS_KEY, reminder.id, json.dumps(payload))
+            pipe.zadd(_DUE_KEY, {reminder.id: eta.timestamp()})
+            await pipe.execute()
+
+    async def cancel(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(_DUE_KEY, *ids)
+            pipe.zrem(_LEASED_KEY, *ids)
+            pipe.hdel(_PAYLOADS_KEY, *ids)
+            await pipe.execute()
+
+    async def claim(self, now: Optional[float] = None) -> list[Reminder]:
+        now = time.time() if now is None else now
+        ids = await self._claim(
+            keys=[_DUE_KEY, _LEASED_KEY],
+            args=[now, self._batch_size, self._lease, now + self._lookahead]
+        )
+        if not ids:
+            return []
+        payloads = await self._redis.hmget(_PAYLOADS_KEY, ids)
+        reminders = []
+        orphans = []
+        for id_, payload in zip(ids, payloads):
+            if payload is None:
+                orphans.append(id_)
+                continue
+            reminders.append(Reminder(id=id_, **json.loads(payload)))
+        if orphans:
+            await self.ack(orphans)
+        return reminders
+
+    async def ack(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(_LEASED_KEY, *ids)
+            pipe.hdel(_PAYLOADS_KEY, *ids)
+            await pipe.execute()
+
+    async def renew(self, ids: list[str], now: Optional[float] = None) -> None:
+        if not ids:
+            return
+        lease_until = (time.time() if now is None else now) + self._lease
+        # XX leaves ids that were acked or cancelled in the meantime out
+        await self._redis.zadd(_LEASED_KEY, {id_: lease_until for id_ in ids}, xx=True)
+
+    async def _keep_leased(self, ids: list[str]) -> None:
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                await self.renew(ids)
+            except RedisError as e:
+                logger.warning(f"Failed to renew the lease of {len(ids)} reminders: {e!r}")
+
+    async def _hand_off(self, handoff: Callable[[list[Reminder]], Awaitable[list[str]]], reminders: list[Reminder]):
+        # A handoff may outlast the lease, e.g. while the sender waits out flood control,
+        # and another scheduler must not claim the same reminders again meanwhile
+        renewal = asyncio.create_task(self._keep_leased([reminder.id for reminder in reminders]))
+        try:
+            return await handoff(reminders)
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+
+    async def pending(self) -> int:
+        return await self._redis.zcard(_DUE_KEY)
+
+    async def run(self, handoff: Callable[[list[Reminder]], Awaitable[list[str]]]) -> None:
+        backoff = self._poll_interval
+        while True:
+            try:
+                reminders = await self.claim()
+            except RedisError as e:
+                logger.error(f"Failed to claim reminders, retrying in {backoff}s: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+                continue
+            backoff = self._poll_interval
+            if reminders:
+                try:
+                    delivered = await self._hand_off(handoff, reminders)
+                except Exception as e:
+                    # Left leased, they are claimed again once the lease runs out
+                    logger.error(f"Failed to hand off {len(reminders)} reminders: {e!r}")
+                    await asyncio.sleep(self._poll_interval)
+                    continue
+                if len(delivered) < len(reminders):
+                    # Only delivered ones are acked, the rest is claimed again once the lease runs out
+                    logger.warning(f"{len(reminders) - len(delivered)} of {len(reminders)} reminders not delivered")
+                try:
+                    await self.ack(delivered)
+                except RedisError as e:
+                    # Already delivered, they are sent again once the lease runs out
+                    logger.error(f"Failed to ack {len(delivered)} reminders: {e!r}")
+                    await asyncio.sleep(self._poll_interval)
+                    continue
+            if len(reminders) < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramBadRequest, TelegramAPIError
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from src.infra.scheduler import Reminder
+from src.infra.rate_limit import rate_limit_priority
+from src.logger import logger
+
+
+# Telegram rejects longer messages, titles have no length limit so groups are cut by size too
+_MESSAGE_LIMIT = 4096
+_GROUP_HEADER = "<b>Reminders</b>\n\n"
+
+
+@dataclass(slots=True)
+class Notification:
+    chat_id: int
+    tg_name: str
+    text: str
+    task_ids: list[int]
+    reminders: list[Reminder]
+
+
+def reminder_kb(task_ids: list[int]) -> InlineKeyboardMarkup:
+    if len(task_ids) == 1:
+        return InlineKeyboardMarkup(inline_keyboard=[[
+            InlineKeyboardButton(text="To task", callback_data=f"get_task_{task_ids[0]}")
+        ]])
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"To task {num}", callback_data=f"get_task_{task_id}")]
+        for num, task_id in enumerate(task_ids, 1)
+    ])
+
+
+def _line(num: int, text: str) -> str:
+    return f"{num}. {text}"
+
+
+def _notification(chat_id: int, tasks: list[list[Reminder]]) -> Notification:
+    # Reminders of one task share a line and a button, the first one's text is shown
+    if len(tasks) == 1:
+        text = f"<b>{tasks[0][0].text}</b>"
+    else:
+        text = _GROUP_HEADER + "\n".join(_line(num, group[0].text) for num, group in enumerate(tasks, 1))
+    return Notification(
+        chat_id,
+        tasks[0][0].tg_name,
+        text,
+        [group[0].task_id for group in tasks],
+        [reminder for group in tasks for reminder in group]
+    )
+
+
+def coalesce(reminders: list[Reminder], max_group: int = 10) -> list[Notification]:
+    by_chat: dict[int, dict[int, list[Reminder]]] = {}
+    for reminder in reminders:
+        by_chat.setdefault(reminder.chat_id, {}).setdefault(reminder.task_id, []).append(reminder)
+    notifications = []
+    for chat_id, by_task in by_chat.items():
+        group: list[list[Reminder]] = []
+        length = len(_GROUP_HEADER)
+        for task_reminders in by_task.values():
+            line = len(_line(len(group) + 1, task_reminders[0].text)) + 1
+            if group and (len(group) >= max_group or length + line > _MESSAGE_LIMIT):
+                notifications.append(_notification(chat_id, group))
+                group = []
+                length = len(_GROUP_HEADER)
+                line = len(_line(1, task_reminders[0].text)) + 1
+            group.append(task_reminders)
+            length += line
+        if group:
+            notifications.append(_notification(chat_id, group))
+    return notifications
+
+
+def split(notification: Notification) -> list[Notification]:
+    by_task: dict[int, list[Reminder]] = {}
+    for reminder in notification.reminders:
+        by_task.setdefault(reminder.task_id, []).append(reminder)
+    return [_notification(notification.chat_id, [task_reminders]) for task_reminders in by_task.values()]
+
+
+class TelegramSender:
+    def __init__(self, bot: Bot, concurrency: int = 20, retries: int = 3):
+        self._bot = bot
+        self._concurrency = concurrency
+        self._retries = retries
+        self._queue: asyncio.Queue[tuple[Notification, asyncio.Future]] = asyncio.Queue(concurrency * 4)
+        self._workers: list[asyncio.Task] = []
+        # Flood control from Telegram applies to the whole bot, so a 429 pauses every worker
+        self._paused_until = 0.0
+        self.sent = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._concurrency)]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def send_many(self, notifications: list[Notification]) -> list[bool]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for notification in notifications:
+            future = loop.create_future()
+            await self._queue.put((notification, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _wait_pause(self) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _work(self) -> None:
+        rate_limit_priority.set("low")
+        while True:
+            notification, future = await self._queue.get()
+            try:
+                ok = await self._send(notification)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                logger.exception(f"Unexpected error sending reminder to user '{notification.tg_name}': {e!r}")
+                ok = False
+            finally:
+                self._queue.task_done()
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+            if not future.done():
+                future.set_result(ok)
+
+    async def _send(self, notification: Notification) -> bool:
+        attempt = 0
+        while True:
+            await self._wait_pause()
+            try:
+                await self._bot.send_message(
+                    chat_id=notification.chat_id,
+                    text=notification.text,
+                    parse_mode="HTML",
+                    disable_web_page_preview=True,
+                    reply_markup=reminder_kb(notification.task_ids)
+                )
+                return True
+            except TelegramRetryAfter as e:
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                logger.warning(f"Flood control hit, pausing sends for {e.retry_after}s")
+                continue
+            except TelegramNetworkError as e:
+                if attempt >= self._retries:
+                    logger.error(f"Failed to send reminder to user '{notification.tg_name}': {e}")
+                    return False
+                attempt += 1
+                await asyncio.sleep(0.5 * 2 ** attempt)
+            except TelegramBadRequest as e:
+                if len(notification.task_ids) == 1:
+                    logger.error(f"Failed to send reminder to user '{notification.tg_name}': {e}")
+                    return False
+                # One bad title must not cost the user every other reminder of the group
+                logger.warning(f"Merged reminders to user '{notification.tg_name}' rejected, sending one by one: {e}")
+                results = [await self._send(part) for part in split(notification)]
+                return all(results)
+            except TelegramAPIError as e:
+                logger.error(f"Failed to send reminder to user '{notification.tg_name}': {e}")
+                return False
@@ -1,2 +1,2 @@
 from .jwt import JWTService
-from .notify import CeleryNotifyService
+from .notify import CeleryNotifyService, RedisNotifyService
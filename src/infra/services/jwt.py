@@ -1,12 +1,46 @@
 import jwt
 import time
+from collections import OrderedDict
 
 from src.application.interfaces.services import TokenServiceInterface
 
 
 class JWTService(TokenServiceInterface):
-    def __init__(self, secret: str):
+    def __init__(
+        self,
+        secret: str,
+        lifetime: int = 5,
+        refresh_margin: int = 1,
+        cache_size: int = 1024
+    ):
         self._secret = secret
+        self._lifetime = lifetime
+        self._refresh_margin = refresh_margin
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _sign(self, tg_name: str, exp: int) -> str:
+        return jwt.encode({"tg_name": tg_name, "exp": exp}, self._secret, "HS256")
 
     def generate_token(self, tg_name: str) -> str:
-        return jwt.encode({"tg_name": tg_name, "exp": int(time.time() + 5)}, self._secret, "HS256")
+        now = time.time()
+        cached = self._cache.get(tg_name)
+        if cached and cached[1] - self._refresh_margin > now:
+            self._cache.move_to_end(tg_name)
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        exp = int(now + self._lifetime)
+        token = self._sign(tg_name, exp)
+        self._cache[tg_name] = (token, exp)
+        self._cache.move_to_end(tg_name)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return token
@@ -1,17 +1,70 @@
+import asyncio
+import uuid
 from datetime import datetime
-
-from celery.result import AsyncResult
+from typing import Literal, Optional
 
 from src.application.interfaces.services import NotifyServiceInterface
-from src.infra.tasks.notify import notify
+from src.infra.tasks.notify import schedule_reminder
+from src.infra.scheduler import ReminderScheduler, Reminder
 from src.celery_app import celery_app
 
 
 class CeleryNotifyService(NotifyServiceInterface):
-    def send_notify(self, tg_name: str, task_id: int, message_text: str, chat_id: int, scheduled_time: datetime) -> str:
-        async_res = notify.apply_async(args=[message_text, chat_id, tg_name, task_id], eta=scheduled_time)
-        return async_res.id
+    def __init__(self, cancel_mode: Literal["revoke", "tombstone"] = "revoke", max_eta: int = 1800):
+        self._cancel_mode = cancel_mode
+        self._max_eta = max_eta
+
+    async def send_notify(
+        self,
+        tg_name: str,
+        task_id: int,
+        message_text: str,
+        chat_id: int,
+        scheduled_time: datetime,
+        id_: Optional[str] = None
+    ) -> str:
+        id_ = id_ or str(uuid.uuid4())
+        await asyncio.to_thread(
+            schedule_reminder,
+            message_text,
+            chat_id,
+            tg_name,
+            task_id,
+            scheduled_time,
+            id_,
+            self._max_eta
+        )
+        return id_
+
+    async def revoke_reminder(self, id_: str) -> None:
+        await self.revoke_many([id_])
+
+    async def revoke_many(self, ids: list[str]) -> None:
+        # Tombstone mode relies on the caller having dropped the ids from the reminders tab,
+        # the notify task checks the tab before sending
+        if ids and self._cancel_mode == "revoke":
+            await asyncio.to_thread(celery_app.control.revoke, ids, terminate=True)
+
+
+class RedisNotifyService(NotifyServiceInterface):
+    def __init__(self, scheduler: ReminderScheduler):
+        self._scheduler = scheduler
+
+    async def send_notify(
+        self,
+        tg_name: str,
+        task_id: int,
+        message_text: str,
+        chat_id: int,
+        scheduled_time: datetime,
+        id_: Optional[str] = None
+    ) -> str:
+        reminder = Reminder(id_ or str(uuid.uuid4()), message_text, chat_id, tg_name, task_id)
+        await self._scheduler.schedule(reminder, scheduled_time)
+        return reminder.id
+
+    async def revoke_reminder(self, id_: str) -> None:
+        await self._scheduler.cancel([id_])
 
-    def revoke_reminder(self, id_: str) -> None:
-        res = AsyncResult(id_, app=celery_app)
-        res.revoke(terminate=True)
+    async def revoke_many(self, ids: list[str]) -> None:
+        await self._scheduler.cancel(ids)
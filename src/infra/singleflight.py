@@ -0,0 +1,32 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    # Keys are tuples of the call name and its owner, e.g. ("get_task", tg_name, task_id)
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.saved = 0
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def forget(self, owner: Hashable) -> None:
+        # Calls already running keep their result, callers arriving later start a fresh one
+        for key in [key for key in self._calls if key[1] == owner]:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.saved += 1
+        return await asyncio.shield(call)
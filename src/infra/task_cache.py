@@ -0,0 +1,226 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Iterable, Any
+
+from redis.asyncio import Redis
+
+from src.application.dto.task import task_adapter, tasks_page_adapter, TasksPageDTO
+from src.application.interfaces import TaskCacheInterface, TasksPage
+from src.domain.entities import Task
+
+
+def _group(parent_id: Optional[int]) -> str:
+    return "root" if parent_id is None else str(parent_id)
+
+
+def _page_to_json(page: TasksPage) -> bytes:
+    return tasks_page_adapter.dump_json(TasksPageDTO(*page))
+
+
+def _page_from_json(raw: str) -> TasksPage:
+    page = tasks_page_adapter.validate_json(raw)
+    return page.prev_page, page.next_page, page.tasks
+
+
+# Fills only land while the user's generation is still the one read before the fetch,
+# so a fetch racing with an invalidation does not put the old value back.
+# An empty ARGV generation writes unconditionally.
+_SET_TASK = """
+if ARGV[3] ~= '' and (redis.call('GET', KEYS[2]) or '0') ~= ARGV[3] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+_SET_PAGE = """
+if ARGV[4] ~= '' and (redis.call('GET', KEYS[3]) or '0') ~= ARGV[4] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3], 'NX')
+redis.call('SADD', KEYS[2], KEYS[1])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _count(self, value: Any) -> Any:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class LRUTaskCache(_CacheStats, TaskCacheInterface):
+    def __init__(self, ttl: int, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._clock = 0
+        # Users whose generation was evicted read the highest evicted one, so a fill started before can not match
+        self._floor = 0
+
+    def _bump(self, tg_name: str) -> None:
+        self._clock += 1
+        self._generations[tg_name] = self._clock
+        self._generations.move_to_end(tg_name)
+        while len(self._generations) > self._max_size:
+            self._floor = max(self._floor, self._generations.popitem(last=False)[1])
+
+    def _stale(self, tg_name: str, generation: Optional[int]) -> bool:
+        return generation is not None and generation != self._generations.get(tg_name, self._floor)
+
+    def _get(self, key: tuple) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set(self, key: tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def generation(self, tg_name: str) -> int:
+        return self._generations.get(tg_name, self._floor)
+
+    async def get_task(self, tg_name: str, task_id: int) -> Optional[Task]:
+        return self._count(self._get(("task", tg_name, task_id)))
+
+    async def set_task(self, tg_name: str, task: Task, generation: Optional[int] = None) -> None:
+        if not self._stale(tg_name, generation):
+            self._set(("task", tg_name, task.id), task)
+
+    async def get_page(self, tg_name: str, parent_id: Optional[int], key: str) -> Optional[TasksPage]:
+        pages = self._get(("pages", tg_name, _group(parent_id)))
+        return self._count(pages.get(key) if pages else None)
+
+    async def has_page(self, tg_name: str, parent_id: Optional[int], key: str) -> bool:
+        pages = self._get(("pages", tg_name, _group(parent_id)))
+        return bool(pages) and key in pages
+
+    async def set_page(
+        self,
+        tg_name: str,
+        parent_id: Optional[int],
+        key: str,
+        page: TasksPage,
+        generation: Optional[int] = None
+    ) -> None:
+        if self._stale(tg_name, generation):
+            return
+        group = ("pages", tg_name, _group(parent_id))
+        pages = self._get(group)
+        if pages is None:
+            self._set(group, {key: page})
+        else:
+            pages[key] = page
+
+    async def invalidate_tasks(self, tg_name: str, task_ids: Iterable[int]) -> None:
+        self._bump(tg_name)
+        for task_id in task_ids:
+            self._entries.pop(("task", tg_name, task_id), None)
+            self._entries.pop(("pages", tg_name, _group(task_id)), None)
+
+    async def invalidate_pages(self, tg_name: str, parent_ids: Optional[Iterable[Optional[int]]] = None) -> None:
+        self._bump(tg_name)
+        if parent_ids is None:
+            groups = [key for key in self._entries if key[0] == "pages" and key[1] == tg_name]
+        else:
+            groups = [("pages", tg_name, _group(parent_id)) for parent_id in parent_ids]
+        for group in groups:
+            self._entries.pop(group, None)
+
+
+class RedisTaskCache(_CacheStats, TaskCacheInterface):
+    def __init__(self, redis: Redis, ttl: int):
+        self._redis = redis
+        self._ttl = ttl
+        self._set_task = redis.register_script(_SET_TASK)
+        self._set_page = redis.register_script(_SET_PAGE)
+
+    def _task_key(self, tg_name: str, task_id: int) -> str:
+        return f"tcache:{tg_name}:task:{task_id}"
+
+    def _pages_key(self, tg_name: str, parent_id: Optional[int]) -> str:
+        return f"tcache:{tg_name}:pages:{_group(parent_id)}"
+
+    def _groups_key(self, tg_name: str) -> str:
+        return f"tcache:{tg_name}:groups"
+
+    def _generation_key(self, tg_name: str) -> str:
+        return f"tcache:{tg_name}:gen"
+
+    async def generation(self, tg_name: str) -> int:
+        return int(await self._redis.get(self._generation_key(tg_name)) or 0)
+
+    async def _invalidate(self, tg_name: str, keys: list[str]) -> None:
+        # The generation only has to outlive fetches in flight, which are far shorter than the ttl
+        generation_key = self._generation_key(tg_name)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*keys)
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, self._ttl)
+            await pipe.execute()
+
+    async def get_task(self, tg_name: str, task_id: int) -> Optional[Task]:
+        raw = await self._redis.get(self._task_key(tg_name, task_id))
+        return self._count(task_adapter.validate_json(raw) if raw else None)
+
+    async def set_task(self, tg_name: str, task: Task, generation: Optional[int] = None) -> None:
+        await self._set_task(
+            keys=[self._task_key(tg_name, task.id), self._generation_key(tg_name)],
+            args=[task_adapter.dump_json(task), self._ttl, "" if generation is None else generation]
+        )
+
+    async def get_page(self, tg_name: str, parent_id: Optional[int], key: str) -> Optional[TasksPage]:
+        raw = await self._redis.hget(self._pages_key(tg_name, parent_id), key)
+        return self._count(_page_from_json(raw) if raw else None)
+
+    async def has_page(self, tg_name: str, parent_id: Optional[int], key: str) -> bool:
+        return bool(await self._redis.hexists(self._pages_key(tg_name, parent_id), key))
+
+    async def set_page(
+        self,
+        tg_name: str,
+        parent_id: Optional[int],
+        key: str,
+        page: TasksPage,
+        generation: Optional[int] = None
+    ) -> None:
+        await self._set_page(
+            keys=[self._pages_key(tg_name, parent_id), self._groups_key(tg_name), self._generation_key(tg_name)],
+            args=[key, _page_to_json(page), self._ttl, "" if generation is None else generation]
+        )
+
+    async def invalidate_tasks(self, tg_name: str, task_ids: Iterable[int]) -> None:
+        keys = []
+        for task_id in task_ids:
+            keys.extend([self._task_key(tg_name, task_id), self._pages_key(tg_name, task_id)])
+        await self._invalidate(tg_name, keys)
+
+    async def invalidate_pages(self, tg_name: str, parent_ids: Optional[Iterable[Optional[int]]] = None) -> None:
+        if parent_ids is None:
+            keys = list(await self._redis.smembers(self._groups_key(tg_name)))
+            keys.append(self._groups_key(tg_name))
+        else:
+            keys = [self._pages_key(tg_name, parent_id) for parent_id in parent_ids]
+        await self._invalidate(tg_name, keys)
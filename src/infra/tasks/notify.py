@@ -1,9 +1,12 @@
-import requests
+import time
+from datetime import datetime, timedelta, timezone
 
+import httpx
 from dishka.integrations.celery import FromDishka
 
 from src.application.interfaces.storage import SyncStorageInterface
-from src.infra.configs import BotConfig
+from src.infra.configs import BotConfig, NotifyConfig, CeleryConfig
+from src.infra.rate_limit import SyncRedisRateLimiter
 from src.celery_app import celery_app
 from src.logger import logger
 
@@ -16,10 +19,19 @@ def notify(
     tg_name: str,
     task_id: int,
     storage: FromDishka[SyncStorageInterface],
-    conf: FromDishka[BotConfig]
+    conf: FromDishka[BotConfig],
+    client: FromDishka[httpx.Client],
+    limiter: FromDishka[SyncRedisRateLimiter],
+    notify_conf: FromDishka[NotifyConfig]
 ):
+    if notify_conf.notify_cancel == "tombstone" and not storage.get_reminder(tg_name, self.request.id, task_id):
+        logger.info(f"Reminder '{self.request.id}' of user '{tg_name}' was cancelled, skipping")
+        return
+    retry_after = None
     try:
-        response = requests.post(
+        if conf.rate_limit_enabled:
+            limiter.acquire(chat_id, "low")
+        response = client.post(
             conf.bot_send_message_url,
             json={
                 "chat_id": chat_id,
@@ -32,8 +44,52 @@ def notify(
                     ]]}
             }
         )
-        response.raise_for_status()
+        if response.status_code == 429:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+        else:
+            response.raise_for_status()
     except Exception as e:
         logger.error(f"An error occured when trying to send reminder to user '{tg_name}': {e}")
-    finally:
-        storage.delete_reminders(tg_name, [self.request.id], task_id)
+    if retry_after is not None:
+        if conf.rate_limit_enabled:
+            limiter.pause(retry_after)
+        if self.request.retries < self.max_retries:
+            # The reminder stays in the tab, so the tombstone check still lets the retry through
+            logger.warning(f"Flood control hit sending reminder to user '{tg_name}', retrying in {retry_after}s")
+            raise self.retry(countdown=retry_after)
+        logger.error(f"Gave up sending reminder to user '{tg_name}' after {self.request.retries} flood control retries")
+    storage.delete_reminders(tg_name, [self.request.id], task_id)
+
+
+def schedule_reminder(text: str, chat_id: int, tg_name: str, task_id: int, eta: datetime, id_: str, max_eta: int):
+    # Redis hands a task waiting for its ETA to another worker once the visibility timeout runs out,
+    # so reminders further away than that wait in hops shorter than it. Every hop keeps the reminder id.
+    args = [text, chat_id, tg_name, task_id]
+    if eta.timestamp() - time.time() > max_eta:
+        hop_reminder.apply_async(
+            args=[*args, eta.isoformat()],
+            eta=datetime.now(timezone.utc) + timedelta(seconds=max_eta),
+            task_id=id_
+        )
+    else:
+        notify.apply_async(args=args, eta=eta, task_id=id_)
+
+
+@celery_app.task(bind=True)
+def hop_reminder(
+    self,
+    text: str,
+    chat_id: int,
+    tg_name: str,
+    task_id: int,
+    eta: str,
+    storage: FromDishka[SyncStorageInterface],
+    notify_conf: FromDishka[NotifyConfig],
+    celery_conf: FromDishka[CeleryConfig]
+):
+    if notify_conf.notify_cancel == "tombstone" and not storage.get_reminder(tg_name, self.request.id, task_id):
+        logger.info(f"Reminder '{self.request.id}' of user '{tg_name}' was cancelled, skipping")
+        return
+    schedule_reminder(
+        text, chat_id, tg_name, task_id, datetime.fromisoformat(eta), self.request.id, celery_conf.max_eta
+    )
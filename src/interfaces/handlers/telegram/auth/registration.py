@@ -1,18 +1,27 @@
-from aiogram import Router, F, types
+from aiogram import F, types
 from aiogram.fsm.context import FSMContext
 from dishka.integrations.aiogram import FromDishka
 
 from src.application.interfaces.clients import BackendClientInterface
+from src.application.interfaces import AsyncStorageInterface
 from src.interfaces.presentators.telegram.keyboards.shared import main_page_kb
 from src.logger import logger
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
-registration_router = Router(name="Registration")
+registration_router = IndexedRouter(name="Registration")
 
 
 @registration_router.callback_query(F.data == 'register')
-async def register(event: types.CallbackQuery, context: FSMContext, backend: FromDishka[BackendClientInterface]):
+async def register(
+    event: types.CallbackQuery,
+    context: FSMContext,
+    backend: FromDishka[BackendClientInterface],
+    storage: FromDishka[AsyncStorageInterface]
+):
     await event.answer()
     ok, data = await backend.register(event.from_user.username)
+    if ok:
+        await storage.set_registered(event.from_user.username)
     message = '<b>Registration confirmed succesfully! Now you have to define your time zone in settings</b>'
     kb = main_page_kb()
     if not ok:
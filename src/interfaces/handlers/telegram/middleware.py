@@ -1,9 +1,14 @@
+import asyncio
+import time
 from typing import Callable, Awaitable, Dict, Any
 
-from aiogram import BaseMiddleware
-from aiogram.types import CallbackQuery, TelegramObject
+from aiogram import BaseMiddleware, Bot
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery, TelegramObject, Update, User, Chat
 from aiogram.fsm.context import FSMContext
 
+from src.application.interfaces import AsyncStorageInterface, ProfileCacheInterface
+from src.domain.entities import UserProfile
 from src.interfaces.handlers.telegram.errors import HandlerError
 from src.logger import logger
 
@@ -42,6 +47,175 @@ class HandleErrorMiddleware(BaseMiddleware):
             )
 
 
+class UserProfileMiddleware(BaseMiddleware):
+    def __init__(self, profiles: ProfileCacheInterface, storage: AsyncStorageInterface):
+        self._profiles = profiles
+        self._storage = storage
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user: User = data.get("event_from_user")  # type: ignore
+        chat: Chat = data.get("event_chat")  # type: ignore
+        if not user or not user.username:
+            data["profile"] = UserProfile()
+            return await handler(event, data)
+        try:
+            profile = await self._profiles.get(user.username)
+        except Exception as e:
+            # Outer middlewares run before HandleErrorMiddleware, so reply here the same way it would
+            logger.exception(f"Failed to load profile of user '{user.username}': {e!r}")
+            answer = event.message.answer if isinstance(event, CallbackQuery) else event.answer  # type: ignore
+            return await answer(
+                text="<b>Service unaccessible. Try later or write to support</b>",
+                reply_markup=None,
+                parse_mode="HTML"
+            )
+        if chat and profile.chat_id != chat.id:
+            try:
+                await self._storage.set_chat_id(user.username, chat.id)
+            except Exception as e:
+                logger.warning(f"Failed to save chat id of user '{user.username}': {e!r}")
+        data["profile"] = profile
+        return await handler(event, data)
+
+
+class InFlightMiddleware(BaseMiddleware):
+    def __init__(self):
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        # Let updates that were accepted but not started yet reach the middleware
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class UserQueueMiddleware(BaseMiddleware):
+    def __init__(self, concurrency: int, max_in_flight: int):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._max_in_flight = max_in_flight
+        # Per-user lock and number of that user's updates holding or waiting for it
+        self._queues: dict[int, tuple[asyncio.Lock, int]] = {}
+        self.waiting = 0
+        self.running = 0
+        self.shed = 0
+        self.max_depth = 0
+        self.max_user_depth = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self.waiting + self.running
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.wait_count if self.wait_count else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"depth {self.depth} ({self.waiting} waiting), max depth {self.max_depth}, "
+            f"max per user {self.max_user_depth}, wait avg {self.wait_avg:.3f}s max {self.wait_max:.3f}s, "
+            f"shed {self.shed}"
+        )
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if self.depth >= self._max_in_flight:
+            self.shed += 1
+            return await self._reply_busy(event, data)
+        user: User = data.get("event_from_user")  # type: ignore
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        started = time.monotonic()
+        queue = self._enter(user.id) if user else None
+        waiting = True
+        try:
+            if queue is not None:
+                await queue.acquire()
+            try:
+                # Slots are taken after the user's turn, so a chatty user holds at most one
+                async with self._slots:
+                    waiting = False
+                    self.waiting -= 1
+                    self._waited(time.monotonic() - started)
+                    self.running += 1
+                    try:
+                        return await handler(event, data)
+                    finally:
+                        self.running -= 1
+            finally:
+                if queue is not None:
+                    queue.release()
+        finally:
+            if waiting:
+                self.waiting -= 1
+            if user:
+                self._leave(user.id)
+
+    def _enter(self, user_id: int) -> asyncio.Lock:
+        lock, depth = self._queues.get(user_id, (asyncio.Lock(), 0))
+        self._queues[user_id] = (lock, depth + 1)
+        self.max_user_depth = max(self.max_user_depth, depth + 1)
+        return lock
+
+    def _leave(self, user_id: int) -> None:
+        lock, depth = self._queues[user_id]
+        if depth > 1:
+            self._queues[user_id] = (lock, depth - 1)
+        else:
+            del self._queues[user_id]
+
+    def _waited(self, wait: float) -> None:
+        self.wait_count += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    async def _reply_busy(self, event: TelegramObject, data: Dict[str, Any]) -> None:
+        bot: Bot = data["bot"]
+        chat: Chat = data.get("event_chat")  # type: ignore
+        try:
+            if isinstance(event, Update) and event.callback_query:
+                await bot.answer_callback_query(
+                    event.callback_query.id,
+                    text="Bot is busy, try again in a moment",
+                    show_alert=True
+                )
+            elif chat:
+                await bot.send_message(chat.id, "<b>Bot is busy, try again in a moment</b>", parse_mode="HTML")
+        except TelegramAPIError as e:
+            logger.warning(f"Failed to reply to a shed update: {e}")
+
+
 # class RollbackDetectorMiddleware(BaseMiddleware):
 #     """this middleware detected messages that bot sending what could be rollback"""
 
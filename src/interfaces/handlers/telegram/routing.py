@@ -0,0 +1,127 @@
+import operator
+from typing import Any, Optional
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject, FilterObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters.callback_data import CallbackQueryFilter
+from aiogram.types import CallbackQuery, TelegramObject
+from magic_filter import MagicFilter
+from magic_filter.operations import GetAttributeOperation, ComparatorOperation, CallOperation
+
+
+def _callback_key(filter_: FilterObject) -> Optional[tuple[str, str]]:
+    # ("exact", value) for F.data == value, ("prefix", value) for F.data.startswith(value)
+    # and CallbackData filters, None when the filter can not narrow down callback data
+    if isinstance(filter_.callback, CallbackQueryFilter):
+        callback_data = filter_.callback.callback_data
+        if not callback_data.model_fields:
+            return "exact", callback_data.__prefix__
+        return "prefix", callback_data.__prefix__ + callback_data.__separator__
+    magic: Optional[MagicFilter] = getattr(filter_, "magic", None)
+    if magic is None:
+        return None
+    ops = magic._operations
+    if not ops or not isinstance(ops[0], GetAttributeOperation) or ops[0].name != "data":
+        return None
+    if (
+        len(ops) == 2
+        and isinstance(ops[1], ComparatorOperation)
+        and ops[1].comparator is operator.eq
+        and isinstance(ops[1].right, str)
+    ):
+        return "exact", ops[1].right
+    if (
+        len(ops) == 3
+        and isinstance(ops[1], GetAttributeOperation)
+        and ops[1].name == "startswith"
+        and isinstance(ops[2], CallOperation)
+        and len(ops[2].args) == 1
+        and not ops[2].kwargs
+        and isinstance(ops[2].args[0], str)
+    ):
+        return "prefix", ops[2].args[0]
+    return None
+
+
+class _TrieNode:
+    __slots__ = ("children", "handlers")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.handlers: list[tuple[int, HandlerObject]] = []
+
+
+class CallbackIndex:
+    def __init__(self, handlers: list[HandlerObject]):
+        self._exact: dict[str, list[tuple[int, HandlerObject]]] = {}
+        self._prefixes = _TrieNode()
+        self._unindexed: list[tuple[int, HandlerObject]] = []
+        for order, handler in enumerate(handlers):
+            self._add(order, handler)
+
+    def _add(self, order: int, handler: HandlerObject) -> None:
+        key = next(filter(None, map(_callback_key, handler.filters or [])), None)
+        if key is None:
+            self._unindexed.append((order, handler))
+        elif key[0] == "exact":
+            self._exact.setdefault(key[1], []).append((order, handler))
+        else:
+            node = self._prefixes
+            for char in key[1]:
+                node = node.children.setdefault(char, _TrieNode())
+            node.handlers.append((order, handler))
+
+    def candidates(self, data: Optional[str]) -> list[HandlerObject]:
+        found = list(self._unindexed)
+        if data is not None:
+            found.extend(self._exact.get(data, ()))
+            node = self._prefixes
+            found.extend(node.handlers)
+            for char in data:
+                node = node.children.get(char)  # type: ignore
+                if node is None:
+                    break
+                found.extend(node.handlers)
+        # Candidates still go through every filter, in the order they were registered
+        found.sort(key=lambda item: item[0])
+        return [handler for _, handler in found]
+
+
+class CallbackQueryObserver(TelegramEventObserver):
+    def __init__(self, router: Router, event_name: str = "callback_query"):
+        super().__init__(router, event_name)
+        self._index: Optional[CallbackIndex] = None
+        self._indexed = 0
+
+    @property
+    def index(self) -> CallbackIndex:
+        if self._index is None or self._indexed != len(self.handlers):
+            self._index = CallbackIndex(self.handlers)
+            self._indexed = len(self.handlers)
+        return self._index
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        data = event.data if isinstance(event, CallbackQuery) else None
+        for handler in self.index.candidates(data):
+            kwargs["handler"] = handler
+            result, filter_data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(filter_data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+
+class IndexedRouter(Router):
+    def __init__(self, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self.callback_query = CallbackQueryObserver(self)
+        self.observers["callback_query"] = self.callback_query
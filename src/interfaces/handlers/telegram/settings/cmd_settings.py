@@ -1,9 +1,10 @@
-from aiogram import types, Router, F
+from aiogram import types, F
 from aiogram.fsm.context import FSMContext
 
 from src.interfaces.presentators.telegram.keyboards.settings import settings_list_kb
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
-settings_router = Router(name='Settings')
+settings_router = IndexedRouter(name='Settings')
 
 
 @settings_router.callback_query(F.data == "settings")
@@ -1,4 +1,4 @@
-from aiogram import types, F, Router
+from aiogram import types, F
 from aiogram.fsm.context import FSMContext
 from dishka.integrations.aiogram import FromDishka
 
@@ -9,8 +9,9 @@ from src.interfaces.presentators.telegram.keyboards.settings import timezones_pa
 from src.interfaces.presentators.telegram.keyboards.shared import back_kb
 from src.interfaces.handlers.telegram.errors import HandlerError
 from src.logger import logger
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
-tz_router = Router(name="Set timezone")
+tz_router = IndexedRouter(name="Set timezone")
 
 
 @tz_router.callback_query(F.data.startswith('set_timezone'))
@@ -33,14 +34,18 @@ async def search_tzinfo_by_country(
 ):
     country_code = country_client.get_country_code_by_name(event.text)
     if not country_code:
-        raise HandlerError("Enter valid country name", clear_context=False)
+        suggestions = country_client.suggest_countries(event.text)
+        message = "Enter valid country name"
+        if suggestions:
+            message += f". Did you mean: {', '.join(suggestions)}?"
+        raise HandlerError(message, clear_state=False)
     offsets = await tz_client.get_country_tz_offsets_minutes(country_code)
     if not offsets:
         raise HandlerError(
             "Timezones not found. Try again or write to support",
             kb=back_kb("settings")
         )
-    await context.update_data(offsets=offsets)
+    await context.update_data(country=country_code)
     await event.answer(
         text="<b>Select your timezone</b>",
         reply_markup=timezones_page_kb(1, 5, offsets),
@@ -52,10 +57,19 @@ async def search_tzinfo_by_country(
 async def another_tz_page(
     event: types.CallbackQuery,
     context: FSMContext,
+    tz_client: FromDishka[TimezoneClientInterface],
 ):
     await event.answer()
     page = int(event.data.split("_")[-1])
-    await event.message.edit_reply_markup(reply_markup=timezones_page_kb(page, 5, await context.get_value("offsets")))
+    data = await context.get_data()
+    if data.get("country"):
+        offsets = await tz_client.get_country_tz_offsets_minutes(data["country"])
+    else:
+        # Setups started before the country was kept in state still carry the offsets list
+        offsets = data.get("offsets")
+    if not offsets:
+        raise HandlerError("Timezone setup expired. Start again", kb=back_kb("settings"))
+    await event.message.edit_reply_markup(reply_markup=timezones_page_kb(page, 5, offsets))
 
 
 @tz_router.callback_query(F.data.startswith("set_tz_offset_"))
@@ -1,23 +1,36 @@
-from aiogram import types, Router, F
+from aiogram import types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.filters.command import CommandStart
 from dishka.integrations.aiogram import FromDishka
 
 from src.application.interfaces.clients import BackendClientInterface
+from src.application.interfaces import AsyncStorageInterface
+from src.domain.entities import UserProfile
 from src.interfaces.presentators.telegram.keyboards.shared import main_kb
 from src.interfaces.presentators.telegram.keyboards.auth import register_kb
 from .errors import HandlerError
+from .routing import IndexedRouter
 
 
-start_router = Router(name='Start')
+start_router = IndexedRouter(name='Start')
 
 
 @start_router.message(CommandStart())
-async def cmd_start(event: types.Message, context: FSMContext,  backend: FromDishka[BackendClientInterface]):
+async def cmd_start(
+    event: types.Message,
+    context: FSMContext,
+    profile: UserProfile,
+    backend: FromDishka[BackendClientInterface],
+    storage: FromDishka[AsyncStorageInterface]
+):
     await context.clear()
-    ok, registered = await backend.check_registered(event.from_user.username)  # type: ignore
-    if not ok:
-        raise HandlerError("Service unaccessible. Try later")
+    registered = profile.registered
+    if not registered:
+        ok, registered = await backend.check_registered(event.from_user.username)  # type: ignore
+        if not ok:
+            raise HandlerError("Service unaccessible. Try later")
+        if registered:
+            await storage.set_registered(event.from_user.username)  # type: ignore
     if not registered:
         return await event.answer(f"<b>Hello! Register in service</b>", reply_markup=register_kb(), parse_mode="HTML")
     return await event.answer(f"<b>Hello there!</b>", reply_markup=main_kb(), parse_mode="HTML")
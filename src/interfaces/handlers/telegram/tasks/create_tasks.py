@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from aiogram import types, F, Router, Bot
+from aiogram import types, F, Bot
 from aiogram.fsm.context import FSMContext
 from aiogram3_calendar import simple_cal_callback, SimpleCalendar as calendar
 from dishka.integrations.aiogram import FromDishka
@@ -12,13 +12,14 @@ from src.interfaces.presentators.telegram.keyboards.tasks import under_task_info
 from src.interfaces.handlers.telegram.states.task import CreateTaskStates
 from src.interfaces.adapters.time import validate_time
 from src.interfaces.presentators.task import show_task_data
+from src.domain.entities import UserProfile
 from src.application.interfaces.clients import BackendClientInterface
-from src.application.interfaces import AsyncStorageInterface
 from src.interfaces.handlers.telegram.errors import HandlerError
 from src.logger import logger
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
 
-create_task_router = Router(name='Create tasks')
+create_task_router = IndexedRouter(name='Create tasks')
 
 
 @create_task_router.callback_query(F.data == 'create_task')
@@ -40,11 +41,11 @@ async def ask_description(event: types.Message, context: FSMContext):
 async def check_tz(
     event: types.Message,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     await context.update_data({'description': event.text})
     await context.set_state(CreateTaskStates.waiting_deadline_date)
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     if not user_tz:
         raise HandlerError(
             "You have to define your timezone in settings",
@@ -63,13 +64,13 @@ async def ask_deadline_date(
     event: types.CallbackQuery,
     callback_data: simple_cal_callback,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     await event.answer()
     selected, date = await calendar().process_selection(event, callback_data)
     if not selected:
         return
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     selected_local: datetime = date.replace(tzinfo=user_tz)
     now_local = datetime.now(timezone.utc).astimezone(user_tz)
     if selected_local.date() < now_local.date():
@@ -95,7 +96,7 @@ async def ask_deadline_date(
 async def set_deadline_time(
     event: types.CallbackQuery,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface],
+    profile: UserProfile,
     backend: FromDishka[BackendClientInterface]
 ):
     suf = event.data.split("_")[-1]
@@ -111,7 +112,7 @@ async def set_deadline_time(
     hour = int(suf)
     data = await context.get_data()
     await context.clear()
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     data["deadline"] = datetime.fromisoformat(data["deadline"]).replace(hour=hour)
     await event.message.edit_text(
         f"<b>Choosen deadline time is {data["deadline"].strftime("%Hh:%Mm")}</b>",
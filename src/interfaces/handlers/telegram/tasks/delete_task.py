@@ -1,4 +1,4 @@
-from aiogram import types, F, Router
+from aiogram import types, F
 from aiogram.fsm.context import FSMContext
 from dishka.integrations.aiogram import FromDishka
 
@@ -8,8 +8,9 @@ from src.application.interfaces.services import NotifyServiceInterface
 from src.application.interfaces import AsyncStorageInterface
 from src.interfaces.handlers.telegram.errors import HandlerError
 from src.logger import logger
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
-delete_task_router = Router(name='Delete tasks')
+delete_task_router = IndexedRouter(name='Delete tasks')
 
 
 @delete_task_router.callback_query(F.data.startswith('delete_task_'))
@@ -52,9 +53,6 @@ async def delete_task_yes(
         "parent_id") else f"get_tasks_{data["deleted_status"]}_1")
     if not ok:
         raise HandlerError(res, kb=kb)
-    to_revoke = await storage.delete_all_reminders(event.from_user.username, data["task_id"])
-    for sub_id in res:
-        to_revoke.extend(await storage.delete_all_reminders(event.from_user.username, sub_id))
-    for reminder_id in to_revoke:
-        notify_service.revoke_reminder(reminder_id)
+    to_revoke = await storage.delete_all_reminders_many(event.from_user.username, [data["task_id"], *res])
+    await notify_service.revoke_many(to_revoke)
     await event.message.answer("<b>Task deleted</b>", reply_markup=kb, parse_mode="HTML")
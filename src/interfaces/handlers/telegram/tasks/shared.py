@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timezone, timedelta
 
 from src.application.interfaces import AsyncStorageInterface
@@ -39,7 +40,7 @@ class ChangeDeadline(BaseUseCase):
             for reminder_id, eta in reminders_map.items():
                 if eta > new_deadline.astimezone(timezone.utc):
                     to_revoke.append(reminder_id)
-                    self._notify_service.revoke_reminder(reminder_id)
+            await self._notify_service.revoke_many(to_revoke)
             await self._storage.delete_reminders(username, to_revoke, updating_task_id)
         return res
 
@@ -64,8 +65,15 @@ class SetReminder:
     ):
         delta_str = show_timedelta_verbose(remining_time)
         msg = f'<b>Task "{task_title}" is waiting! Deadline over ' + delta_str + "</b>"
-        id_ = self._notify_service.send_notify(username, task_id, msg, chat_id, eta)
+        # The tab entry must exist before the reminder can fire, the notify task treats
+        # a missing entry as cancelled
+        id_ = str(uuid.uuid4())
         await self._storage.set_reminder(username, eta, id_, task_id)
+        try:
+            await self._notify_service.send_notify(username, task_id, msg, chat_id, eta, id_)
+        except Exception:
+            await self._storage.delete_reminders(username, [id_], task_id)
+            raise
 
 
 class ForceFinishTask(BaseUseCase):
@@ -73,11 +81,8 @@ class ForceFinishTask(BaseUseCase):
         ok, res = await self._backend.force_finish_task(username, task_id)
         if not ok:
             raise HandlerError(res, kb=back_kb(f"get_task_{task_id}"))
-        to_revoke = await self._storage.delete_all_reminders(username, task_id)
-        for sub_id in res:
-            to_revoke.extend(await self._storage.delete_all_reminders(username, sub_id))
-        for reminder_id in to_revoke:
-            self._notify_service.revoke_reminder(reminder_id)
+        to_revoke = await self._storage.delete_all_reminders_many(username, [task_id, *res])
+        await self._notify_service.revoke_many(to_revoke)
 
 
 class FinishTask(BaseUseCase):
@@ -86,5 +91,4 @@ class FinishTask(BaseUseCase):
         if not ok:
             raise HandlerError(res, kb=back_kb(f"get_task_{task_id}"))
         to_revoke = await self._storage.delete_all_reminders(username, task_id)
-        for reminder_id in to_revoke:
-            self._notify_service.revoke_reminder(reminder_id)
+        await self._notify_service.revoke_many(to_revoke)
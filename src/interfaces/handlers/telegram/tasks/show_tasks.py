@@ -1,16 +1,17 @@
-from aiogram import types, F, Router
+from aiogram import types, F
 from aiogram.fsm.context import FSMContext
 from dishka.integrations.aiogram import FromDishka
 
+from src.domain.entities import UserProfile
 from src.application.interfaces.clients import BackendClientInterface
-from src.application.interfaces import AsyncStorageInterface
 from src.interfaces.presentators.telegram.keyboards.tasks import under_task_info_kb, no_tasks_kb, page_tasks_kb, no_subtasks_kb
 from src.interfaces.presentators.telegram.keyboards.shared import main_page_kb, back_kb
 from src.interfaces.presentators.task import show_task_data
 from src.logger import logger
 from src.interfaces.handlers.telegram.errors import HandlerError
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 
-show_task_router = Router(name='Show tasks')
+show_task_router = IndexedRouter(name='Show tasks')
 
 
 @show_task_router.callback_query(F.data.startswith('get_tasks_'))
@@ -78,7 +79,7 @@ async def task_info(
     event: types.CallbackQuery,
     context: FSMContext,
     backend: FromDishka[BackendClientInterface],
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     await event.answer()
     await context.clear()
@@ -86,7 +87,7 @@ async def task_info(
     ok, task = await backend.get_task(event.from_user.username, task_id)
     if not ok:
         raise HandlerError(task, kb=main_page_kb())
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     return await event.message.answer(
         text=show_task_data(task, user_tz),
         reply_markup=under_task_info_kb(task),
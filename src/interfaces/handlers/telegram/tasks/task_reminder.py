@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, timedelta
 
-from aiogram import Router, types, F, Bot
+from aiogram import types, F, Bot
 from aiogram.fsm.context import FSMContext
 from aiogram3_calendar import simple_cal_callback, SimpleCalendar as calendar   # type: ignore
 from dishka.integrations.aiogram import FromDishka
@@ -8,6 +8,7 @@ from dishka.integrations.aiogram import FromDishka
 from src.interfaces.presentators.telegram.keyboards.times import kalendar_kb, remind_time_kb
 from src.interfaces.presentators.telegram.keyboards.shared import back_kb
 from src.interfaces.presentators.telegram.keyboards.tasks import reminders_kb, no_reminders_kb, under_reminder_kb
+from src.domain.entities import UserProfile
 from src.application.interfaces.clients import BackendClientInterface
 from src.application.interfaces import AsyncStorageInterface
 from src.application.interfaces.services import NotifyServiceInterface
@@ -16,22 +17,23 @@ from src.interfaces.handlers.telegram.states import RemindState
 from src.interfaces.handlers.telegram.errors import HandlerError
 from src.interfaces.presentators.time import show_timedelta_verbose
 from src.logger import logger
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 from .shared import SetReminder
 
-reminder_router = Router(name="Reminder")
+reminder_router = IndexedRouter(name="Reminder")
 
 
 @reminder_router.callback_query(F.data.startswith('add_reminder_'))
 async def add_reminder(
     event: types.CallbackQuery,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface],
+    profile: UserProfile,
     backend: FromDishka[BackendClientInterface]
 ):
     await event.answer()
     await context.clear()
     task_id = int(event.data.split('_')[-1])   # type: ignore
-    user_tz = await storage.get_tz(event.from_user.username)   # type: ignore
+    user_tz = profile.tz
     now_local = datetime.now(timezone.utc).astimezone(user_tz)
     ok, res = await backend.get_task(event.from_user.username, task_id)
     if not ok:
@@ -264,14 +266,15 @@ async def set_remind_hour_manually(
 async def show_reminders(
     event: types.CallbackQuery,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    storage: FromDishka[AsyncStorageInterface],
+    profile: UserProfile
 ):
     await event.answer()
     task_id = event.data.split("_")[-1]
     reminders_tab = await storage.get_reminders_tab(event.from_user.username, task_id)
     if not reminders_tab:
         raise HandlerError("No reminders found", kb=no_reminders_kb(task_id))
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     return await event.message.answer(
         text="<b>Current reminders</b>",
         reply_markup=reminders_kb(reminders_tab, task_id, user_tz),
@@ -283,13 +286,14 @@ async def show_reminders(
 async def show_reminder_actions(
     event: types.CallbackQuery,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    storage: FromDishka[AsyncStorageInterface],
+    profile: UserProfile
 ):
     await event.answer()
     data = event.data.split("_")[2:]
     task_id, reminder_id = int(data[0]), data[1]
     reminder: datetime = await storage.get_reminder(event.from_user.username, reminder_id, task_id)
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     return await event.message.answer(
         text=f"<b>{reminder.astimezone(user_tz).strftime("%d.%m.%Y at %H:%M")}</b>",
         reply_markup=under_reminder_kb(reminder_id, task_id),
@@ -308,7 +312,7 @@ async def delete_reminder(
     data = event.data.split("_")[2:]
     task_id, reminder_id = int(data[0]), data[1]
     await storage.delete_reminders(event.from_user.username, [reminder_id], task_id)
-    notify_service.revoke_reminder(reminder_id)
+    await notify_service.revoke_reminder(reminder_id)
     await context.clear()
     return await event.message.answer(
         text="<b>Reminder deleted</b>",
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from aiogram import types, F, Router, Bot
+from aiogram import types, F, Bot
 from aiogram.fsm.context import FSMContext
 from aiogram3_calendar import SimpleCalendar as calendar, simple_cal_callback  # type: ignore
 from dishka.integrations.aiogram import FromDishka, AiogramMiddlewareData
@@ -10,14 +10,15 @@ from src.interfaces.presentators.telegram.keyboards.times import kalendar_kb, de
 from src.interfaces.presentators.telegram.keyboards.shared import back_kb, yes_or_no_kb
 from src.interfaces.presentators.task import show_task_data
 from src.interfaces.adapters.time import validate_time
+from src.domain.entities import UserProfile
 from src.application.interfaces.clients import BackendClientInterface
-from src.application.interfaces import AsyncStorageInterface
 from src.interfaces.handlers.telegram.states import UpdateTaskStates
 from src.interfaces.handlers.telegram.errors import HandlerError
+from src.interfaces.handlers.telegram.routing import IndexedRouter
 from .shared import ChangeDeadline, FinishTask, ForceFinishTask
 
 
-update_task_router = Router(name='Update tasks')
+update_task_router = IndexedRouter(name='Update tasks')
 
 
 @update_task_router.callback_query(F.data.startswith('update_task_'))
@@ -50,7 +51,7 @@ async def change_task_text_field(
     event: types.Message,
     context: FSMContext,
     backend: FromDishka[BackendClientInterface],
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     data = await context.get_data()
     await context.clear()
@@ -59,7 +60,7 @@ async def change_task_text_field(
     ok, res = await backend.update_task(event.from_user.username, data["updating_task"], **to_update)
     if not ok:
         raise HandlerError(res, kb=back_kb(f"get_task_{data["updating_task"]}"))
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     return await event.answer(
         text=show_task_data(res, user_tz), reply_markup=under_task_info_kb(res), parse_mode="HTML")
 
@@ -68,10 +69,10 @@ async def change_task_text_field(
 async def ask_enter_new_deadline_date(
     event: types.CallbackQuery,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     await event.answer()
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     now_local = datetime.now(timezone.utc).astimezone(user_tz)
     await context.set_state(UpdateTaskStates.waiting_deadline_date)
     return await event.message.answer(
@@ -86,12 +87,12 @@ async def ask_enter_new_deadline_time(
     event: types.CallbackQuery,
     callback_data: simple_cal_callback,
     context: FSMContext,
-    storage: FromDishka[AsyncStorageInterface]
+    profile: UserProfile
 ):
     selected, date = await calendar().process_selection(event, callback_data)
     if not selected:
         return
-    user_tz = await storage.get_tz(event.from_user.username)
+    user_tz = profile.tz
     now_local = datetime.now(timezone.utc).astimezone(user_tz)
     selected_local: datetime = date.replace(tzinfo=user_tz)
     if now_local.date() > selected_local.date():
@@ -0,0 +1 @@
+from .supervisor import ForwardMiddleware, WorkerPool, consume
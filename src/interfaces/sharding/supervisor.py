@@ -0,0 +1,134 @@
+import asyncio
+import multiprocessing
+import time
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from typing import Callable, Awaitable, Dict, Any, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.types import TelegramObject, Update, User, Chat
+
+from src.logger import logger
+
+
+class ForwardMiddleware(BaseMiddleware):
+    def __init__(self, queues: list[Queue]):
+        self._queues = queues
+        self.forwarded = [0] * len(queues)
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        update: Update = event  # type: ignore
+        user: Optional[User] = data.get("event_from_user")
+        chat: Optional[Chat] = data.get("event_chat")
+        # The same user always lands on the same worker, so their updates stay in order
+        key = user.id if user else chat.id if chat else update.update_id
+        shard = key % len(self._queues)
+        self._queues[shard].put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+        self.forwarded[shard] += 1
+
+
+def _join(workers: list[BaseProcess], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+        if worker.is_alive():
+            logger.warning(f"{worker.name} did not stop after {timeout}s, terminating")
+            worker.terminate()
+            worker.join()
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        target: Callable[[Queue], None],
+        count: int,
+        on_failure: Callable[[], None],
+        max_restarts: int = 5,
+        restart_window: float = 60.0
+    ):
+        self._target = target
+        # Workers build their own container and dispatcher, nothing is inherited from the supervisor
+        self._context = multiprocessing.get_context("spawn")
+        self.queues: list[Queue] = [self._context.Queue() for _ in range(count)]
+        self._workers: list[BaseProcess] = []
+        self._on_failure = on_failure
+        self._max_restarts = max_restarts
+        self._restart_window = restart_window
+        self._restarted_at: list[float] = []
+        self._watcher: Optional[asyncio.Task] = None
+        self.restarts = 0
+        self.failed = False
+
+    def _spawn(self, num: int) -> BaseProcess:
+        worker = self._context.Process(
+            target=self._target,
+            args=(self.queues[num],),
+            name=f"bot-worker-{num}",
+            daemon=True
+        )
+        worker.start()
+        return worker
+
+    def start(self, check_interval: float = 1.0) -> None:
+        self._workers = [self._spawn(num) for num in range(len(self.queues))]
+        self._watcher = asyncio.create_task(self._watch(check_interval))
+        logger.info(f"Started {len(self._workers)} bot workers")
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for num, worker in enumerate(self._workers):
+                if worker.is_alive():
+                    continue
+                now = time.monotonic()
+                self._restarted_at = [at for at in self._restarted_at if now - at < self._restart_window]
+                if len(self._restarted_at) >= self._max_restarts:
+                    logger.error(
+                        f"{worker.name} exited with code {worker.exitcode}, workers restarted "
+                        f"{len(self._restarted_at)} times in {self._restart_window}s, stopping the bot"
+                    )
+                    self.failed = True
+                    self._on_failure()
+                    return
+                logger.error(
+                    f"{worker.name} exited with code {worker.exitcode}, restarting it. Updates queued for it are lost"
+                )
+                # A worker killed inside get() keeps the queue locked, so the replacement reads a fresh one
+                self.queues[num] = self._context.Queue()
+                self._workers[num] = self._spawn(num)
+                self._restarted_at.append(now)
+                self.restarts += 1
+
+    async def stop(self, timeout: float) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        for queue, worker in zip(self.queues, self._workers):
+            if worker.is_alive():
+                queue.put(None)
+        await asyncio.to_thread(_join, self._workers, timeout)
+
+
+async def _feed(dispatcher: Dispatcher, bot: Bot, update: dict[str, Any]) -> None:
+    try:
+        await dispatcher.feed_raw_update(bot, update)
+    except Exception:
+        # Already logged by the dispatcher
+        pass
+
+
+async def consume(dispatcher: Dispatcher, bot: Bot, updates: Queue, timeout: float) -> None:
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task] = set()
+    while (update := await loop.run_in_executor(None, updates.get)) is not None:
+        task = asyncio.create_task(_feed(dispatcher, bot, update))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
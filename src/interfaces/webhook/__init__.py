@@ -0,0 +1 @@
+from .server import run_webhook
@@ -0,0 +1,50 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from src.infra.configs import BotConfig
+from src.logger import logger
+
+
+def webhook_secret(conf: BotConfig) -> str:
+    # Every replica derives the same secret from the bot token unless one is configured
+    return conf.webhook_secret or hashlib.sha256(conf.bot_token.encode()).hexdigest()
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    conf: BotConfig,
+    stop: asyncio.Event,
+    drain: Callable[[], Awaitable[None]]
+):
+    secret = webhook_secret(conf)
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher,
+        bot,
+        handle_in_background=True,
+        secret_token=secret
+    ).register(app, path=conf.webhook_path)
+    setup_application(app, dispatcher, bot=bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, conf.webhook_host, conf.webhook_port)
+    await site.start()
+    if conf.webhook_url:
+        await bot.set_webhook(
+            conf.webhook_url.rstrip("/") + conf.webhook_path,
+            secret_token=secret,
+            allowed_updates=dispatcher.resolve_used_update_types()
+        )
+    logger.info(f"Listening for webhook updates on {conf.webhook_host}:{conf.webhook_port}{conf.webhook_path}")
+    try:
+        await stop.wait()
+        await site.stop()
+        await drain()
+    finally:
+        await runner.cleanup()
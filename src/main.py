@@ -1,16 +1,35 @@
 import asyncio
-import watchfiles
+import os
+import signal
+from functools import partial
+from multiprocessing.queues import Queue
+from typing import Awaitable, Callable, Coroutine, Optional
 
 from aiogram import Bot, Dispatcher
 from dishka.integrations.aiogram import setup_dishka
+from redis.asyncio import Redis
 
+from src.application.interfaces import TaskCacheInterface
+from src.application.interfaces.clients import CountryClientInterface, TimezoneClientInterface
+from src.infra.configs import BotConfig
+from src.interfaces.webhook import run_webhook
+from src.interfaces.sharding import ForwardMiddleware, WorkerPool, consume
 from src.interfaces.handlers.telegram import *
+from src.interfaces.handlers.telegram.middleware import InFlightMiddleware, UserQueueMiddleware
 from src.container import container
+from src.infra.clients.resilience import BackendGuard
+from src.infra.prefetch import Prefetcher
+from src.infra.redis_storage import migrate_reminder_tabs
+from src.infra.singleflight import SingleFlight
 from src.logger import logger
 
+try:
+    import uvloop
+except ImportError:  # not installed on Windows
+    uvloop = None
 
-async def setup():
-    dispatcher = await container.get(Dispatcher)
+
+def include_routers(dispatcher: Dispatcher) -> None:
     dispatcher.include_routers(
         start_router,
         registration_router,
@@ -22,15 +41,170 @@ async def setup():
         tz_router,
         delete_task_router
     )
+
+
+async def prepare() -> Dispatcher:
+    dispatcher = await container.get(Dispatcher)
+    include_routers(dispatcher)
     setup_dishka(container, dispatcher, auto_inject=True)
+    # Both build their lookup tables on creation, do it before the first handler needs them
+    await container.get(CountryClientInterface)
+    await container.get(TimezoneClientInterface)
+    return dispatcher
+
+
+async def drain():
+    conf = await container.get(BotConfig)
+    in_flight = await container.get(InFlightMiddleware)
+    user_queue = await container.get(UserQueueMiddleware)
+    if in_flight.in_flight:
+        logger.info(f"Waiting for {in_flight.in_flight} updates in flight")
+    if not await in_flight.drain(conf.shutdown_timeout):
+        logger.warning(f"{in_flight.in_flight} updates still in flight after {conf.shutdown_timeout}s")
+    if conf.dispatch_mode == "per_user":
+        logger.info(f"Update queues: {user_queue.summary()}")
+    flights = await container.get(SingleFlight)
+    logger.info(f"Backend reads: {flights.calls} calls, {flights.saved} coalesced into a call in flight")
+    guard = await container.get(BackendGuard)
+    logger.info(
+        f"Backend guard: circuit {guard.breaker.state}, opened {guard.breaker.opened} times, "
+        f"{guard.breaker.rejected} calls rejected while open, {guard.budget.spent} retries, "
+        f"{guard.budget.denied} denied by the retry budget"
+    )
+    if conf.task_cache != "none":
+        cache = await container.get(TaskCacheInterface)
+        logger.info(f"Task cache: {cache.hits} hits, {cache.misses} misses, hit rate {cache.hit_rate:.1%}")
+        if conf.prefetch_pages != "none":
+            prefetcher = await container.get(Prefetcher)
+            logger.info(
+                f"Page prefetch: {prefetcher.scheduled} scheduled, {prefetcher.skipped} skipped, "
+                f"{prefetcher.used} pages shown without a backend call"
+            )
+
+
+async def report_queues(interval: float):
+    user_queue = await container.get(UserQueueMiddleware)
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"Update queues: {user_queue.summary()}")
+
+
+def _migration_done(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        # Untouched legacy tabs are still converted one by one when first used
+        logger.error(f"Reminder tab migration failed: {task.exception()!r}")
+
+
+def start_reports(conf: BotConfig) -> Optional[asyncio.Task]:
+    if conf.dispatch_mode != "per_user" or not conf.stats_interval:
+        return None
+    return asyncio.create_task(report_queues(conf.stats_interval))
+
+
+async def serve(dispatcher: Dispatcher, bot: Bot, conf: BotConfig, drain: Callable[[], Awaitable[None]]):
+    if conf.bot_mode == "webhook":
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await run_webhook(dispatcher, bot, conf, stop, drain)
+    else:
+        await bot.delete_webhook()
+        # aiogram stops polling on SIGTERM/SIGINT, handlers keep the session until drained
+        await dispatcher.start_polling(bot, close_bot_session=False)
+        await drain()
+        await bot.session.close()
+
+
+async def supervise(conf: BotConfig):
+    # Stopping goes through the same signal path as a shutdown request, for polling and webhook alike
+    pool = WorkerPool(work, conf.bot_workers, partial(signal.raise_signal, signal.SIGTERM))
+    pool.start()
+    # Handlers never run here, routers are only included so Telegram sends the same update types
+    dispatcher = Dispatcher(disable_fsm=True)
+    include_routers(dispatcher)
+    forward = ForwardMiddleware(pool.queues)
+    dispatcher.update.outer_middleware(forward)
+    bot = Bot(conf.bot_token)
+    stopped = False
+
+    async def stop():
+        nonlocal stopped
+        stopped = True
+        await pool.stop(conf.shutdown_timeout + 5)
+        logger.info(f"Forwarded updates per worker: {forward.forwarded}, worker restarts: {pool.restarts}")
+
+    logger.info("Tracker bot supervisor started...")
+    try:
+        await serve(dispatcher, bot, conf, stop)
+    finally:
+        if not stopped:
+            await stop()
+        await bot.session.close()
+    if pool.failed:
+        raise SystemExit(1)
+
+
+async def setup():
+    conf = await container.get(BotConfig)
+    migration = asyncio.create_task(migrate_reminder_tabs(await container.get(Redis)))
+    migration.add_done_callback(_migration_done)
+    reports = None
+    try:
+        if conf.bot_workers > 1:
+            await supervise(conf)
+        else:
+            dispatcher = await prepare()
+            bot = await container.get(Bot)
+            reports = start_reports(conf)
+            logger.info("Tracker bot started...")
+            await serve(dispatcher, bot, conf, drain)
+    finally:
+        migration.cancel()
+        if reports:
+            reports.cancel()
+        await container.close()
+
+
+async def setup_worker(updates: Queue):
+    conf = await container.get(BotConfig)
+    dispatcher = await prepare()
     bot = await container.get(Bot)
-    await dispatcher.start_polling(bot)
-    logger.info("Tracker bot started...")
+    # Polling and webhook emit these themselves, dishka injects handlers on startup
+    await dispatcher.emit_startup(bot=bot, dispatcher=dispatcher, bots=[bot])
+    reports = start_reports(conf)
+    try:
+        await consume(dispatcher, bot, updates, conf.shutdown_timeout)
+        await drain()
+        await dispatcher.emit_shutdown(bot=bot, dispatcher=dispatcher, bots=[bot])
+        await bot.session.close()
+    finally:
+        if reports:
+            reports.cancel()
+        await container.close()
+
+
+def run(main: Coroutine):
+    if uvloop is not None:
+        asyncio.run(main, loop_factory=uvloop.new_event_loop)
+    else:
+        asyncio.run(main)
+
+
+def work(updates: Queue):
+    # The supervisor owns signals and tells workers to stop through their queue
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_IGN)
+    run(setup_worker(updates))
 
 
 def start():
-    asyncio.run(setup())
+    run(setup())
 
 
 if __name__ == '__main__':
-    watchfiles.run_process('.', target=start)
+    if os.getenv("AUTO_RELOAD", "").lower() in ("1", "true", "yes"):
+        import watchfiles
+        watchfiles.run_process('.', target=start)
+    else:
+        start()
@@ -0,0 +1,66 @@
+import asyncio
+from functools import partial
+
+from src.application.interfaces import AsyncStorageInterface
+from src.container import container
+from src.infra.configs import NotifyConfig
+from src.infra.scheduler import ReminderScheduler, Reminder
+from src.infra.sender import TelegramSender, coalesce
+from src.infra.tasks.notify import notify
+from src.logger import logger
+
+
+def _enqueue(reminders: list[Reminder]):
+    for reminder in reminders:
+        notify.apply_async(
+            args=[reminder.text, reminder.chat_id, reminder.tg_name, reminder.task_id],
+            task_id=reminder.id
+        )
+
+
+async def celery_handoff(reminders: list[Reminder]) -> list[str]:
+    await asyncio.to_thread(_enqueue, reminders)
+    return [reminder.id for reminder in reminders]
+
+
+async def direct_handoff(
+    sender: TelegramSender,
+    storage: AsyncStorageInterface,
+    max_group: int,
+    reminders: list[Reminder]
+) -> list[str]:
+    notifications = coalesce(reminders, max_group)
+    results = await sender.send_many(notifications)
+    delivered = [
+        reminder
+        for notification, ok in zip(notifications, results) if ok
+        for reminder in notification.reminders
+    ]
+    tabs: dict[tuple[str, int], list[str]] = {}
+    for reminder in delivered:
+        tabs.setdefault((reminder.tg_name, reminder.task_id), []).append(reminder.id)
+    await storage.delete_reminders_many(tabs)
+    return [reminder.id for reminder in delivered]
+
+
+async def setup():
+    conf = await container.get(NotifyConfig)
+    scheduler = await container.get(ReminderScheduler)
+    if conf.scheduler_handoff == "celery":
+        handoff = celery_handoff
+    else:
+        handoff = partial(
+            direct_handoff,
+            await container.get(TelegramSender),
+            await container.get(AsyncStorageInterface),
+            conf.coalesce_max
+        )
+    logger.info(f"Reminder scheduler started, {await scheduler.pending()} reminders pending")
+    try:
+        await scheduler.run(handoff)
+    finally:
+        await container.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(setup())